@@ -1,9 +1,17 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, send_from_directory
 from supabase import create_client, Client
-from datetime import datetime
+from markupsafe import Markup
+from datetime import date, datetime
+import hashlib
 import os
 from dotenv import load_dotenv
-from backend.llm import translate_text, generate_tags, summarize_note
+from backend.llm import generate_tags, summarize_note, get_client, reset_client, scheduler
+from backend.llm_scheduler import LLMBusyError, INTERACTIVE, BACKGROUND
+from backend.sync import parse_sync_token, fetch_changes, maybe_compact_tombstones
+from backend.fragment_cache import FragmentCache
+from backend.note_extractor import extract_note_locally, correct_event_fields
+from backend.translation_memory import translate_with_memory
+from backend.suggest import suggest_index
 
 # Load environment variables
 load_dotenv()
@@ -25,6 +33,14 @@ SUPABASE_KEY = os.getenv('SUPABASE_KEY')
 # Initialize Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# Columns a client is allowed to change on an existing note
+EDITABLE_FIELDS = ('title', 'content', 'category', 'tags', 'event_date', 'event_time')
+
+# Rendered note cards, shared by the home and search pages
+NOTE_CARD_TEMPLATE = '_note_card.html'
+note_card_cache = FragmentCache(int(os.getenv('NOTE_CARD_CACHE_SIZE', '2000')))
+_note_card_template_version = None
+
 # Explicitly serve static files for Vercel
 @app.route('/static/<path:filename>')
 def serve_static(filename):
@@ -42,6 +58,90 @@ def init_db():
         print(f"Note: Table might not exist yet. Please run init_supabase.py first.")
         print(f"Error: {e}")
 
+def update_note_if_version(id, version, fields):
+    """
+    Update a note only if it is still at the expected version.
+    The version check is part of the UPDATE's WHERE clause, so a successful
+    save is a single round trip. The database trigger bumps `version` and
+    sets `updated_at`.
+    
+    Returns (updated_note, None) on success, (None, current_note) on a
+    version conflict and (None, None) if the note does not exist.
+    """
+    response = supabase.table('notes').update(fields).eq('id', id).eq('version', version).execute()
+    if response.data:
+        return response.data[0], None
+    
+    # Nothing matched: either the note is gone or the version moved on
+    response = supabase.table('notes').select('*').eq('id', id).execute()
+    return None, (response.data[0] if response.data else None)
+
+def warmup():
+    """
+    Compile every template and fill local caches.
+    The production server calls this once before forking workers, so each
+    worker starts with them ready instead of paying on its first requests.
+    The suggest index is loaded with the master's Supabase client, which
+    every worker replaces with its own after the fork.
+    """
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
+    get_note_card_template_version()
+    print(f"✓ Warmed up {len(app.jinja_env.list_templates())} templates")
+    
+    try:
+        suggest_index.refresh(supabase)
+        print(f"✓ Loaded search suggestions (sync token {suggest_index.token})")
+    except Exception as e:
+        print(f"Error loading suggest index: {e}")
+
+def warmup_worker():
+    """
+    Prepare a freshly forked worker: give it its own API clients and bring
+    the suggest index inherited from the master up to date. Only changes
+    since the master loaded it are fetched, also for recycled workers.
+    """
+    global supabase
+    supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
+    reset_client()
+    if os.getenv('GITHUB_TOKEN'):
+        get_client()
+    
+    try:
+        suggest_index.refresh(supabase)
+    except Exception as e:
+        print(f"Error loading suggest index: {e}")
+
+def get_note_card_template_version():
+    """Hash of the note card template source, so editing it invalidates cached cards"""
+    global _note_card_template_version
+    
+    # Templates auto-reload in debug mode, so re-check the source every time
+    if _note_card_template_version is None or app.debug:
+        source, _, _ = app.jinja_env.loader.get_source(app.jinja_env, NOTE_CARD_TEMPLATE)
+        _note_card_template_version = hashlib.sha1(source.encode('utf-8')).hexdigest()
+    return _note_card_template_version
+
+def render_note_cards(notes):
+    """
+    Render the card HTML for a list of notes.
+    Cards are cached by (id, updated_at, template version), so only notes
+    edited since the last render are rendered again.
+    """
+    template = app.jinja_env.get_template(NOTE_CARD_TEMPLATE)
+    template_version = get_note_card_template_version()
+    
+    cards = []
+    for note in notes:
+        key = (note['id'], note['updated_at'], template_version)
+        html = note_card_cache.get(key)
+        if html is None:
+            html = template.render(note=note)
+            note_card_cache.put(key, html)
+        cards.append(html)
+    
+    return Markup(''.join(cards))
+
 @app.route('/')
 def index():
     sort_by = request.args.get('sort', 'updated')
@@ -69,7 +169,7 @@ def index():
         notes = []
         flash('Error loading notes', 'error')
     
-    return render_template('index.html', notes=notes, sort_by=sort_by)
+    return render_template('index.html', notes=notes, note_cards=render_note_cards(notes), sort_by=sort_by)
 
 @app.route('/add', methods=['GET', 'POST'])
 def add_note():
@@ -100,6 +200,8 @@ def add_note():
             }).execute()
             
             note_id = response.data[0]['id'] if response.data else None
+            if response.data:
+                suggest_index.upsert_note(response.data[0])
             
             # Check if this is from generate page (AJAX request)
             if request.headers.get('X-Requested-With') == 'XMLHttpRequest':
@@ -138,6 +240,59 @@ def view_note(id):
 
 @app.route('/edit/<int:id>', methods=['GET', 'POST'])
 def edit_note(id):
+    if request.method == 'POST':
+        title = request.form['title']
+        content = request.form['content']
+        category = request.form.get('category', '')
+        tags = request.form.get('tags', '')
+        event_date = request.form.get('event_date', None)
+        event_time = request.form.get('event_time', None)
+        version = request.form.get('version', type=int)
+        
+        if not title or not content:
+            flash('Title and content are required!', 'error')
+            return redirect(url_for('edit_note', id=id))
+        
+        if version is None:
+            flash('Missing note version, please reload and try again', 'error')
+            return redirect(url_for('edit_note', id=id))
+        
+        # Convert empty strings to None for NULL in database
+        event_date = event_date if event_date else None
+        event_time = event_time if event_time else None
+        
+        try:
+            note, current = update_note_if_version(id, version, {
+                'title': title,
+                'content': content,
+                'category': category,
+                'tags': tags,
+                'event_date': event_date,
+                'event_time': event_time
+            })
+            
+            if note is None and current is None:
+                flash('Note not found!', 'error')
+                return redirect(url_for('index'))
+            
+            if note is None:
+                # Someone saved this note since the form was loaded. Keep what
+                # the user typed, based on the latest version, and show the
+                # server copy next to it
+                flash('This note was changed elsewhere. Compare with the latest version below and save again.', 'error')
+                draft = dict(current, title=title, content=content, category=category, tags=tags,
+                             event_date=event_date, event_time=event_time)
+                return render_template('edit_note.html', note=draft, server_note=current), 409
+            
+            suggest_index.upsert_note(note)
+            flash('Note updated successfully!', 'success')
+            return redirect(url_for('view_note', id=id))
+            
+        except Exception as e:
+            print(f"Error updating note: {e}")
+            flash('Error updating note', 'error')
+            return redirect(url_for('edit_note', id=id))
+    
     try:
         response = supabase.table('notes').select('*').eq('id', id).execute()
         note = response.data[0] if response.data else None
@@ -146,41 +301,6 @@ def edit_note(id):
             flash('Note not found!', 'error')
             return redirect(url_for('index'))
         
-        if request.method == 'POST':
-            title = request.form['title']
-            content = request.form['content']
-            category = request.form.get('category', '')
-            tags = request.form.get('tags', '')
-            event_date = request.form.get('event_date', None)
-            event_time = request.form.get('event_time', None)
-            
-            if not title or not content:
-                flash('Title and content are required!', 'error')
-                return redirect(url_for('edit_note', id=id))
-            
-            # Convert empty strings to None for NULL in database
-            event_date = event_date if event_date else None
-            event_time = event_time if event_time else None
-            
-            try:
-                supabase.table('notes').update({
-                    'title': title,
-                    'content': content,
-                    'category': category,
-                    'tags': tags,
-                    'event_date': event_date,
-                    'event_time': event_time,
-                    'updated_at': datetime.now().isoformat()
-                }).eq('id', id).execute()
-                
-                flash('Note updated successfully!', 'success')
-                return redirect(url_for('view_note', id=id))
-                
-            except Exception as e:
-                print(f"Error updating note: {e}")
-                flash('Error updating note', 'error')
-                return redirect(url_for('edit_note', id=id))
-        
         return render_template('edit_note.html', note=note)
         
     except Exception as e:
@@ -192,11 +312,18 @@ def edit_note(id):
 def delete_note(id):
     try:
         supabase.table('notes').delete().eq('id', id).execute()
+        suggest_index.remove_note(id)
         flash('Note deleted successfully!', 'success')
     except Exception as e:
         print(f"Error deleting note: {e}")
         flash('Error deleting note', 'error')
     
+    # Deletes leave tombstones behind, purge the expired ones now and then
+    try:
+        maybe_compact_tombstones(supabase)
+    except Exception as e:
+        print(f"Error compacting tombstones: {e}")
+    
     return redirect(url_for('index'))
 
 @app.route('/search')
@@ -217,9 +344,9 @@ def search():
             
             # Add sorting
             if sort_by == 'event_date':
-                search_query = search_query.order('event_date', desc=True, nulls_first=False).order('event_time', desc=True)
+                search_query = search_query.order('event_date', desc=True, nullsfirst=False).order('event_time', desc=True)
             elif sort_by == 'event_time':
-                search_query = search_query.order('event_time', desc=True, nulls_first=False).order('event_date', desc=True)
+                search_query = search_query.order('event_time', desc=True, nullsfirst=False).order('event_date', desc=True)
             elif sort_by == 'created':
                 search_query = search_query.order('created_at', desc=True)
             elif sort_by == 'title':
@@ -237,7 +364,7 @@ def search():
     else:
         notes = []
     
-    return render_template('search.html', notes=notes, query=query, sort_by=sort_by)
+    return render_template('search.html', notes=notes, note_cards=render_note_cards(notes), query=query, sort_by=sort_by)
 
 @app.route('/api/notes')
 def api_notes():
@@ -249,10 +376,150 @@ def api_notes():
         print(f"Error fetching notes API: {e}")
         return jsonify({'error': 'Failed to fetch notes'}), 500
 
+def is_valid_datetime(value, formats):
+    """True if value parses with one of the strptime formats"""
+    for fmt in formats:
+        try:
+            datetime.strptime(value, fmt)
+            return True
+        except ValueError:
+            pass
+    return False
+
+@app.route('/api/notes/<int:id>', methods=['PATCH'])
+def api_patch_note(id):
+    """
+    Update only the given fields of a note
+    PATCH body: {"version": 3, "title": "...", "tags": "..."}
+    Returns 409 with the current server copy if the version is stale.
+    """
+    data = request.get_json(silent=True) or {}
+    version = data.get('version')
+    fields = {key: data[key] for key in EDITABLE_FIELDS if key in data}
+    
+    # bool is a subclass of int, so "version": true must be rejected explicitly
+    if not isinstance(version, int) or isinstance(version, bool):
+        return jsonify({'success': False, 'error': 'Version required'}), 400
+    if not fields:
+        return jsonify({'success': False, 'error': 'No fields to update'}), 400
+    for key, value in fields.items():
+        if not isinstance(value, str) and not (value is None and key in ('event_date', 'event_time')):
+            return jsonify({'success': False, 'error': f'{key} must be a string'}), 400
+    if fields.get('event_date') and not is_valid_datetime(fields['event_date'], ('%Y-%m-%d',)):
+        return jsonify({'success': False, 'error': 'event_date must be YYYY-MM-DD'}), 400
+    if fields.get('event_time') and not is_valid_datetime(fields['event_time'], ('%H:%M', '%H:%M:%S')):
+        return jsonify({'success': False, 'error': 'event_time must be HH:MM'}), 400
+    if ('title' in fields and not fields['title']) or ('content' in fields and not fields['content']):
+        return jsonify({'success': False, 'error': 'Title and content cannot be empty'}), 400
+    
+    # Convert empty strings to None for NULL in database
+    for key in ('event_date', 'event_time'):
+        if key in fields and not fields[key]:
+            fields[key] = None
+    
+    try:
+        note, current = update_note_if_version(id, version, fields)
+        
+        if note is None and current is None:
+            return jsonify({'success': False, 'error': 'Note not found'}), 404
+        if note is None:
+            return jsonify({
+                'success': False,
+                'error': 'Version conflict',
+                'note': current
+            }), 409
+        
+        suggest_index.upsert_note(note)
+        return jsonify({
+            'success': True,
+            'note': note
+        })
+    
+    except Exception as e:
+        print(f"Error patching note: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@app.route('/api/suggest')
+def api_suggest():
+    """
+    Autocomplete titles, tags and categories for the search box
+    Query: ?prefix=bad&limit=8
+    Served from the in-memory suggest index, not the database.
+    """
+    prefix = request.args.get('prefix', '')
+    limit = max(1, min(request.args.get('limit', 8, type=int), 20))
+    
+    # Pull changes from other workers without making this keystroke wait
+    suggest_index.refresh_in_background(supabase)
+    
+    return jsonify({
+        'success': True,
+        'suggestions': suggest_index.suggest(prefix, limit)
+    })
+
+@app.route('/api/sync')
+def api_sync():
+    """
+    Return notes changed and ids deleted since a sync token
+    Query: ?since=<token> (omit for a full sync)
+    Keep calling with the returned token while has_more is true.
+    If reset is true the client must drop its local copy first.
+    """
+    try:
+        since = parse_sync_token(request.args.get('since', ''))
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Invalid sync token'}), 400
+    
+    try:
+        changes = fetch_changes(supabase, since)
+        return jsonify({
+            'success': True,
+            **changes
+        })
+    except Exception as e:
+        print(f"Error fetching sync changes: {e}")
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
 # ============================================
 # LLM API Routes
 # ============================================
 
+def request_priority():
+    """
+    Scheduling priority for the LLM calls of this request.
+    Bulk and background clients send `X-Priority: background` so the
+    editor's calls are served first.
+    """
+    if request.headers.get('X-Priority', '').lower() == 'background':
+        return BACKGROUND
+    return INTERACTIVE
+
+def llm_busy_response(e):
+    """503 telling the client to retry when the LLM queue is full"""
+    response = jsonify({
+        'success': False,
+        'error': str(e)
+    })
+    response.headers['Retry-After'] = '5'
+    return response, 503
+
+@app.route('/api/llm-stats')
+def api_llm_stats():
+    """
+    LLM scheduler metrics for this worker process:
+    queue depth, running calls, coalesced/rejected counts, wait times
+    """
+    return jsonify({
+        'success': True,
+        'stats': scheduler.stats()
+    })
+
 @app.route('/api/translate', methods=['POST'])
 def api_translate():
     """
@@ -267,7 +534,8 @@ def api_translate():
         if not text:
             return jsonify({'error': 'No text provided'}), 400
         
-        translated_text = translate_text(text, target_language)
+        # Only sentences not translated before are sent to the LLM
+        translated_text = translate_with_memory(supabase, text, target_language, priority=request_priority())
         
         return jsonify({
             'success': True,
@@ -276,6 +544,9 @@ def api_translate():
             'target_language': target_language
         })
     
+    except LLMBusyError as e:
+        return llm_busy_response(e)
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -297,13 +568,16 @@ def api_generate_tags():
         if not title and not content:
             return jsonify({'error': 'Title or content required'}), 400
         
-        tags = generate_tags(title, content, max_tags)
+        tags = generate_tags(title, content, max_tags, priority=request_priority())
         
         return jsonify({
             'success': True,
             'tags': tags
         })
     
+    except LLMBusyError as e:
+        return llm_busy_response(e)
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -324,13 +598,16 @@ def api_summarize():
         if not content:
             return jsonify({'error': 'No content provided'}), 400
         
-        summary = summarize_note(content, max_length)
+        summary = summarize_note(content, max_length, priority=request_priority())
         
         return jsonify({
             'success': True,
             'summary': summary
         })
     
+    except LLMBusyError as e:
+        return llm_busy_response(e)
+    
     except Exception as e:
         return jsonify({
             'success': False,
@@ -351,6 +628,16 @@ def api_generate_note():
         if not description:
             return jsonify({'error': 'No description provided'}), 400
         
+        # Short reminders like "Badminton tmr 5pm @polyu" don't need the LLM
+        today = date.today()
+        note_data, confident = extract_note_locally(description, language, today)
+        if confident:
+            return jsonify({
+                'success': True,
+                'note': note_data,
+                'source': 'local'
+            })
+        
         # System prompt as specified with date and time extraction
         system_prompt = f"""Extract the user's notes into the following structured fields:
 1. Title: A concise title of the notes less than 5 words
@@ -360,6 +647,7 @@ def api_generate_note():
 5. EventDate (optional): Extract date if mentioned (format: YYYY-MM-DD). Use null if not available.
 6. EventTime (optional): Extract time if mentioned (format: HH:MM in 24-hour). Use null if not available.
 Output in JSON format without ```json. Output title and notes in the language: {language}.
+Today is {today.strftime('%A')}, {today.isoformat()}.
 
 Date parsing rules:
 - "tomorrow" = next day
@@ -422,7 +710,7 @@ Output:
         from backend.llm import call_llm_model
         import json
         
-        response_text = call_llm_model(messages, temperature=0.3)
+        response_text = call_llm_model(messages, temperature=0.3, priority=request_priority())
         
         # Try to parse JSON response
         try:
@@ -485,11 +773,18 @@ Output:
                 'event_time': None
             }
         
+        # Relative dates resolved by the local rules beat the LLM's guess
+        correct_event_fields(note_data, description, today)
+        
         return jsonify({
             'success': True,
-            'note': note_data
+            'note': note_data,
+            'source': 'llm'
         })
     
+    except LLMBusyError as e:
+        return llm_busy_response(e)
+    
     except Exception as e:
         return jsonify({
             'success': False,
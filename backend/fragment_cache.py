@@ -0,0 +1,50 @@
+"""
+Fragment Cache Module
+Bounded LRU cache for rendered HTML fragments such as note cards
+"""
+import threading
+from collections import OrderedDict
+
+
+class FragmentCache:
+    """
+    Thread-safe LRU cache mapping a key to a rendered HTML string.
+
+    Keys should change whenever the rendered output would change
+    (e.g. note id + updated_at + template version), so entries never need
+    explicit invalidation; stale ones simply age out.
+    """
+
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """Return the cached fragment for key, or None on a miss."""
+        with self._lock:
+            html = self._entries.get(key)
+            if html is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return html
+
+    def put(self, key, html):
+        """Store a fragment, evicting the least recently used ones if full."""
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drop every cached fragment."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
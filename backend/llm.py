@@ -3,9 +3,12 @@ LLM Integration Module
 Provides functions to interact with OpenAI API for note enhancement
 """
 # Import libraries
+import hashlib
+import json
 import os
 from openai import OpenAI
 from dotenv import load_dotenv
+from backend.llm_scheduler import LLMScheduler, INTERACTIVE
 
 # Load environment variables from .env
 load_dotenv()
@@ -15,43 +18,91 @@ token = os.environ.get("GITHUB_TOKEN")
 endpoint = os.environ.get("OPENAI_ENDPOINT", "https://models.github.ai/inference")
 model = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
 
+# Shared client so connections are reused between calls
+_client = None
+
+# Every upstream call goes through this scheduler (one per process)
+scheduler = LLMScheduler(
+    max_concurrency=int(os.environ.get("LLM_MAX_CONCURRENCY", "4")),
+    max_queue=int(os.environ.get("LLM_MAX_QUEUE", "32"))
+)
+
+
+# A function to get the shared OpenAI client
+def get_client():
+    """
+    Return the shared OpenAI client, creating it on first use.
+    
+    Returns:
+        OpenAI: Client for the configured endpoint
+    """
+    global _client
+    if _client is None:
+        _client = OpenAI(base_url=endpoint, api_key=token)
+    return _client
+
+
+# A function to drop the shared client (e.g. in a freshly forked worker)
+def reset_client():
+    """
+    Forget the shared client so the next call creates a new one.
+    Forked server workers must not share the parent's connections.
+    """
+    global _client
+    _client = None
+
+
 # A function to call an LLM model and return the response
-def call_llm_model(messages, temperature=1.0, top_p=1.0, model_name=None):
+def call_llm_model(messages, temperature=1.0, top_p=1.0, model_name=None, priority=INTERACTIVE):
     """
     Call the LLM model with given messages and parameters.
     
+    Calls are queued on the scheduler: interactive calls run before
+    background ones, and identical calls in flight at the same time share
+    a single upstream request.
+    
     Args:
         messages (list): List of message dictionaries with 'role' and 'content'
         temperature (float): Sampling temperature (0-2). Higher = more random
         top_p (float): Nucleus sampling parameter (0-1)
         model_name (str): Optional model override
+        priority (int): INTERACTIVE (default) or BACKGROUND
         
     Returns:
         str: The model's response content
+        
+    Raises:
+        LLMBusyError: If the scheduler queue is full
     """
     if not token:
         raise ValueError("API token not found. Please set GITHUB_TOKEN or OPENAI_API_KEY in .env file")
     
-    client = OpenAI(base_url=endpoint, api_key=token)
+    model_name = model_name or model
+    request_key = hashlib.sha256(
+        json.dumps([messages, temperature, top_p, model_name], sort_keys=True).encode('utf-8')
+    ).hexdigest()
     
-    response = client.chat.completions.create(
-        messages=messages,
-        temperature=temperature,
-        top_p=top_p,
-        model=model_name or model
-    )
+    def create_completion():
+        response = get_client().chat.completions.create(
+            messages=messages,
+            temperature=temperature,
+            top_p=top_p,
+            model=model_name
+        )
+        return response.choices[0].message.content
     
-    return response.choices[0].message.content
+    return scheduler.run(request_key, create_completion, priority)
 
 
 # A function to translate to target language
-def translate_text(text, target_language="Chinese"):
+def translate_text(text, target_language="Chinese", priority=INTERACTIVE):
     """
     Translate text to target language using LLM.
     
     Args:
         text (str): Text to translate
         target_language (str): Target language (default: Chinese)
+        priority (int): INTERACTIVE (default) or BACKGROUND
         
     Returns:
         str: Translated text
@@ -67,17 +118,18 @@ def translate_text(text, target_language="Chinese"):
         }
     ]
     
-    return call_llm_model(messages, temperature=0.3)
+    return call_llm_model(messages, temperature=0.3, priority=priority)
 
 
 # A function to summarize note content
-def summarize_note(content, max_length=100):
+def summarize_note(content, max_length=100, priority=INTERACTIVE):
     """
     Generate a concise summary of note content.
     
     Args:
         content (str): Note content to summarize
         max_length (int): Maximum length of summary in words
+        priority (int): INTERACTIVE (default) or BACKGROUND
         
     Returns:
         str: Summary of the note
@@ -93,11 +145,11 @@ def summarize_note(content, max_length=100):
         }
     ]
     
-    return call_llm_model(messages, temperature=0.5)
+    return call_llm_model(messages, temperature=0.5, priority=priority)
 
 
 # A function to generate tags from note content
-def generate_tags(title, content, max_tags=5):
+def generate_tags(title, content, max_tags=5, priority=INTERACTIVE):
     """
     Automatically generate relevant tags for a note.
     
@@ -105,6 +157,7 @@ def generate_tags(title, content, max_tags=5):
         title (str): Note title
         content (str): Note content
         max_tags (int): Maximum number of tags to generate
+        priority (int): INTERACTIVE (default) or BACKGROUND
         
     Returns:
         str: Comma-separated tags
@@ -120,16 +173,17 @@ def generate_tags(title, content, max_tags=5):
         }
     ]
     
-    return call_llm_model(messages, temperature=0.7)
+    return call_llm_model(messages, temperature=0.7, priority=priority)
 
 
 # A function to improve note content
-def improve_note(content):
+def improve_note(content, priority=INTERACTIVE):
     """
     Improve and enhance note content with better formatting and clarity.
     
     Args:
         content (str): Original note content
+        priority (int): INTERACTIVE (default) or BACKGROUND
         
     Returns:
         str: Improved note content
@@ -145,17 +199,18 @@ def improve_note(content):
         }
     ]
     
-    return call_llm_model(messages, temperature=0.5)
+    return call_llm_model(messages, temperature=0.5, priority=priority)
 
 
 # A function to answer questions about notes
-def ask_about_note(note_content, question):
+def ask_about_note(note_content, question, priority=INTERACTIVE):
     """
     Answer questions about a specific note using LLM.
     
     Args:
         note_content (str): The content of the note
         question (str): The question to ask
+        priority (int): INTERACTIVE (default) or BACKGROUND
         
     Returns:
         str: Answer to the question
@@ -171,7 +226,7 @@ def ask_about_note(note_content, question):
         }
     ]
     
-    return call_llm_model(messages, temperature=0.7)
+    return call_llm_model(messages, temperature=0.7, priority=priority)
 
 
 # Run the main function if this script is executed
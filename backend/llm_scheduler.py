@@ -0,0 +1,190 @@
+"""
+LLM Scheduler Module
+Runs upstream LLM calls on a small pool of threads: identical concurrent
+requests share one call, interactive work goes ahead of background work,
+and a full queue rejects new work immediately
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+
+# Lower number runs first
+INTERACTIVE = 0
+BACKGROUND = 10
+
+PRIORITY_NAMES = {INTERACTIVE: 'interactive', BACKGROUND: 'background'}
+
+
+class LLMBusyError(Exception):
+    """Raised when the scheduler queue is full and a request is turned away"""
+
+
+class _Call:
+    """One upstream call, shared by every caller that asked for the same key"""
+
+    def __init__(self, key, fn, priority):
+        self.key = key
+        self.fn = fn
+        self.priority = priority
+        self.enqueued_at = time.monotonic()
+        self.started = False
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class LLMScheduler:
+    """
+    Priority queue in front of the LLM with single-flight coalescing.
+
+    Args:
+        max_concurrency (int): Upstream calls running at the same time
+        max_queue (int): Queued calls allowed before interactive work is rejected
+        max_background_queue (int): Queued calls allowed before background work
+            is rejected (lower, so bulk jobs never crowd out the editor)
+        timeout (float): Seconds a caller waits for its result
+    """
+
+    def __init__(self, max_concurrency=4, max_queue=32, max_background_queue=None, timeout=120):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.max_background_queue = max_background_queue if max_background_queue is not None else max(1, max_queue // 2)
+        self.timeout = timeout
+        self._reset()
+        # Threads don't survive fork, so a forked worker starts from scratch.
+        # Resetting in the fork hook runs before any request thread exists.
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._heap = []
+        self._inflight = {}
+        self._queued = 0
+        self._running = 0
+        self._counter = itertools.count()
+        self._workers = []
+        self._waits = {}
+        self.completed = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.rejected = 0
+
+    def run(self, key, fn, priority=INTERACTIVE):
+        """
+        Run fn() on the pool and return its result.
+
+        If a call with the same key is already queued or running, wait for
+        that one instead of starting another.
+
+        Args:
+            key (str): Identity of the request (same key = same answer)
+            fn (callable): Performs the upstream call
+            priority (int): INTERACTIVE or BACKGROUND (lower runs first)
+
+        Returns:
+            The value returned by fn
+
+        Raises:
+            LLMBusyError: If the queue is full
+            TimeoutError: If no result arrives within the timeout
+        """
+        with self._lock:
+            self._start_workers()
+
+            call = self._inflight.get(key)
+            if call is not None:
+                self.coalesced += 1
+                # An interactive caller joining a queued background call speeds it up
+                if not call.started and priority < call.priority:
+                    call.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._counter), call))
+                    self._ready.notify()
+            else:
+                limit = self.max_queue if priority <= INTERACTIVE else self.max_background_queue
+                if self._queued >= limit:
+                    self.rejected += 1
+                    raise LLMBusyError("The AI service is busy, please try again shortly")
+
+                call = _Call(key, fn, priority)
+                self._inflight[key] = call
+                self._queued += 1
+                heapq.heappush(self._heap, (priority, next(self._counter), call))
+                self._ready.notify()
+
+        if not call.done.wait(self.timeout):
+            raise TimeoutError("Timed out waiting for the AI service")
+        if call.error is not None:
+            raise call.error
+        return call.result
+
+    def stats(self):
+        """
+        Report queue depth, running calls, counters and recent wait times.
+
+        Returns:
+            dict: Scheduler metrics (wait times in milliseconds)
+        """
+        with self._lock:
+            waits = {}
+            for priority, samples in self._waits.items():
+                if samples:
+                    waits[PRIORITY_NAMES.get(priority, str(priority))] = {
+                        'avg_ms': round(sum(samples) / len(samples) * 1000, 1),
+                        'max_ms': round(max(samples) * 1000, 1),
+                        'samples': len(samples)
+                    }
+
+            return {
+                'queue_depth': self._queued,
+                'running': self._running,
+                'max_concurrency': self.max_concurrency,
+                'max_queue': self.max_queue,
+                'max_background_queue': self.max_background_queue,
+                'completed': self.completed,
+                'failed': self.failed,
+                'coalesced': self.coalesced,
+                'rejected': self.rejected,
+                'wait': waits
+            }
+
+    def _start_workers(self):
+        while len(self._workers) < self.max_concurrency:
+            worker = threading.Thread(target=self._work, name='llm-scheduler', daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def _work(self):
+        while True:
+            with self._lock:
+                while True:
+                    while not self._heap:
+                        self._ready.wait()
+                    _, _, call = heapq.heappop(self._heap)
+                    # Skip the older heap entry of a call whose priority was raised
+                    if not call.started:
+                        break
+                call.started = True
+                self._queued -= 1
+                self._running += 1
+                waited = time.monotonic() - call.enqueued_at
+                self._waits.setdefault(call.priority, deque(maxlen=100)).append(waited)
+
+            try:
+                call.result = call.fn()
+            except BaseException as e:
+                # Re-raised in the caller's thread, this worker keeps serving
+                call.error = e
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._inflight.pop(call.key, None)
+                    if call.error is None:
+                        self.completed += 1
+                    else:
+                        self.failed += 1
+                call.done.set()
@@ -0,0 +1,369 @@
+"""
+Local Note Extraction Module
+Rule-based extraction of structured notes from short descriptions,
+using the same date/time rules as the /api/generate-note system prompt
+"""
+import re
+from datetime import date, datetime, timedelta
+
+WEEKDAYS = ['monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday']
+
+MONTHS = {
+    'jan': 1, 'january': 1, 'feb': 2, 'february': 2, 'mar': 3, 'march': 3,
+    'apr': 4, 'april': 4, 'may': 5, 'jun': 6, 'june': 6, 'jul': 7, 'july': 7,
+    'aug': 8, 'august': 8, 'sep': 9, 'sept': 9, 'september': 9, 'oct': 10, 'october': 10,
+    'nov': 11, 'november': 11, 'dec': 12, 'december': 12
+}
+
+# Shorthand expanded in the note content
+SHORTHAND = {'tmr': 'tomorrow', 'tmrw': 'tomorrow', 'tmw': 'tomorrow', 'tdy': 'today'}
+
+# keyword -> (category, tag), following the category suggestions in the prompt
+KEYWORDS = {
+    'meeting': ('Work', 'meeting'), 'project': ('Work', 'project'), 'deadline': ('Work', 'deadline'),
+    'report': ('Work', 'work'), 'presentation': ('Work', 'presentation'), 'client': ('Work', 'work'),
+    'office': ('Work', 'work'), 'standup': ('Work', 'meeting'), 'interview': ('Work', 'interview'),
+    'homework': ('Study', 'homework'), 'exam': ('Study', 'exam'), 'quiz': ('Study', 'exam'),
+    'assignment': ('Study', 'homework'), 'lecture': ('Study', 'study'), 'class': ('Study', 'study'),
+    'tutorial': ('Study', 'study'), 'study': ('Study', 'study'), 'revision': ('Study', 'study'),
+    'research': ('Study', 'research'), 'thesis': ('Study', 'research'), 'lab': ('Study', 'study'),
+    'doctor': ('Health', 'doctor'), 'dentist': ('Health', 'dentist'), 'clinic': ('Health', 'doctor'),
+    'hospital': ('Health', 'doctor'), 'gym': ('Health', 'exercise'), 'workout': ('Health', 'exercise'),
+    'yoga': ('Health', 'exercise'), 'jogging': ('Health', 'exercise'),
+    'medicine': ('Health', 'medication'), 'medication': ('Health', 'medication'), 'pills': ('Health', 'medication'),
+    'badminton': ('Personal', 'sports'), 'tennis': ('Personal', 'sports'), 'football': ('Personal', 'sports'),
+    'basketball': ('Personal', 'sports'), 'swimming': ('Personal', 'sports'), 'swim': ('Personal', 'sports'),
+    'birthday': ('Personal', 'birthday'), 'party': ('Personal', 'social'), 'dinner': ('Personal', 'social'),
+    'lunch': ('Personal', 'social'), 'haircut': ('Personal', 'appointment'), 'call': ('Personal', 'reminder'),
+    'bill': ('Finance', 'bills'), 'bills': ('Finance', 'bills'), 'rent': ('Finance', 'bills'),
+    'pay': ('Finance', 'payment'), 'budget': ('Finance', 'budget'), 'tax': ('Finance', 'tax'),
+    'taxes': ('Finance', 'tax'), 'invoice': ('Finance', 'payment'), 'bank': ('Finance', 'finance'),
+    'flight': ('Travel', 'flight'), 'trip': ('Travel', 'travel'), 'hotel': ('Travel', 'booking'),
+    'airport': ('Travel', 'flight'), 'passport': ('Travel', 'travel'),
+    'buy': ('Shopping', 'shopping'), 'shopping': ('Shopping', 'shopping'), 'groceries': ('Shopping', 'groceries'),
+    'grocery': ('Shopping', 'groceries'), 'milk': ('Shopping', 'groceries'), 'eggs': ('Shopping', 'groceries'),
+    'bread': ('Shopping', 'groceries'), 'supermarket': ('Shopping', 'groceries'),
+    'idea': ('Ideas', 'ideas'), 'ideas': ('Ideas', 'ideas'), 'brainstorm': ('Ideas', 'brainstorming')
+}
+
+# Descriptions longer than this (after removing date/time words) go to the LLM
+MAX_LOCAL_WORDS = 8
+
+# Abbreviations that are also everyday words ("sun", "sat", "wed", "mon") only
+# count as weekdays after "next"/"this"; "may", "mar" and "march" only count as
+# months when capitalised or followed by an ordinal ("May 5", "may 5th")
+AMBIGUOUS_WEEKDAYS = ['mon', 'wed', 'sat', 'sun']
+AMBIGUOUS_MONTHS = {'may', 'mar', 'march'}
+
+_MONTH_NAMES = '|'.join(sorted(MONTHS, key=len, reverse=True))
+_WEEKDAY_NAMES = '|'.join(WEEKDAYS + ['tues', 'tue', 'thurs', 'thur', 'thu', 'fri'])
+
+_RELATIVE_DAY = re.compile(r'\b(day after (?:tomorrow|tmr|tmrw)|tomorrow|tmrw|tmr|tmw|today|tdy|tonight)\b', re.IGNORECASE)
+_WEEKDAY = re.compile(r'\b(?:(next|this|on)\s+)?(' + _WEEKDAY_NAMES + r')\b', re.IGNORECASE)
+_WEEKDAY_SHORT = re.compile(r'\b(next|this)\s+(' + '|'.join(AMBIGUOUS_WEEKDAYS) + r')\b', re.IGNORECASE)
+_MONTH_DAY = re.compile(r'\b(' + _MONTH_NAMES + r')\.?\s+(\d{1,2})(st|nd|rd|th)?\b', re.IGNORECASE)
+_DAY_MONTH = re.compile(r'\b(\d{1,2})(st|nd|rd|th)?\s+(' + _MONTH_NAMES + r')\b', re.IGNORECASE)
+_ISO_DATE = re.compile(r'\b(\d{4})-(\d{2})-(\d{2})\b')
+
+_TIME_12H = re.compile(r'\b(?:at\s+)?(\d{1,2})(?::([0-5]\d))?\s*(am|pm)\b', re.IGNORECASE)
+_TIME_24H = re.compile(r'\b(?:at\s+)?([01]?\d|2[0-3]):([0-5]\d)\b', re.IGNORECASE)
+_TIME_WORD = re.compile(r'\b(?:at\s+)?(noon|midnight)\b', re.IGNORECASE)
+
+
+# A function to find an event date in free text
+def find_event_date(text, today=None):
+    """
+    Find the date mentioned in text, preferring explicit dates over
+    relative ones.
+
+    Args:
+        text (str): Free text, e.g. "Badminton tmr 5pm @polyu"
+        today (date): Reference date (default: today)
+
+    Returns:
+        tuple: (date string YYYY-MM-DD or None, (start, end) span or None)
+    """
+    for found, span in _date_mentions(text, today or date.today()):
+        return found, span
+    return None, None
+
+
+# A function to find every event date in free text
+def find_event_dates(text, today=None):
+    """
+    Find every date mentioned in text, in reading order.
+
+    Args:
+        text (str): Free text, e.g. "Moved from Monday to Friday"
+        today (date): Reference date (default: today)
+
+    Returns:
+        list: (date string YYYY-MM-DD, (start, end) span) pairs
+    """
+    return _in_reading_order(_date_mentions(text, today or date.today()))
+
+
+# A function to find an event time in free text
+def find_event_time(text):
+    """
+    Find the time mentioned in text, preferring am/pm times.
+
+    Args:
+        text (str): Free text, e.g. "Meeting at 9:30am"
+
+    Returns:
+        tuple: (time string HH:MM in 24-hour or None, (start, end) span or None)
+    """
+    for found, span in _time_mentions(text):
+        return found, span
+    return None, None
+
+
+# A function to find every event time in free text
+def find_event_times(text):
+    """
+    Find every time mentioned in text, in reading order.
+
+    Args:
+        text (str): Free text, e.g. "Call at 9am, not 10am"
+
+    Returns:
+        list: (time string HH:MM in 24-hour, (start, end) span) pairs
+    """
+    return _in_reading_order(_time_mentions(text))
+
+
+# A function to extract a structured note without calling the LLM
+def extract_note_locally(description, language='English', today=None):
+    """
+    Extract a structured note from a short description using rules only.
+
+    Args:
+        description (str): Natural language description
+        language (str): Output language requested by the user
+        today (date): Reference date for relative dates (default: today)
+
+    Returns:
+        tuple: (note dict in database format, confident flag). When the flag
+        is False the result should not be used and the LLM should be called.
+    """
+    event_date, date_span = find_event_date(description, today)
+    event_time, time_span = find_event_time(description)
+
+    # Blank out the date/time phrases so they don't end up in the title
+    remainder = description
+    for span in sorted([s for s in (date_span, time_span) if s], reverse=True):
+        remainder = remainder[:span[0]] + ' ' + remainder[span[1]:]
+
+    words = re.findall(r"@?[\w'&-]+", remainder)
+    title_words = _title_words(words)
+
+    matches = [KEYWORDS[word.lower()] for word in words if word.lower() in KEYWORDS]
+    matched_words = [word.lower() for word in words if word.lower() in KEYWORDS]
+    category = _pick_category(matches)
+    tags = _pick_tags(matches, matched_words)
+
+    # "7:30" could be morning or evening, the prompt's rules don't say
+    ambiguous_time = bool(
+        time_span
+        and _TIME_24H.fullmatch(description[time_span[0]:time_span[1]])
+        and 1 <= int(event_time[:2]) <= 12
+    )
+
+    confident = (
+        language.strip().lower() in ('english', 'en')
+        and not ambiguous_time
+        and category is not None
+        and 0 < len(title_words) <= 4
+        and len(words) <= MAX_LOCAL_WORDS
+        # Leftover digits mean a date or time we could not parse
+        and not re.search(r'\d', remainder)
+        # Several dates or times ("from Monday to Friday") need the LLM to pick one
+        and len({found for found, _ in find_event_dates(description, today)}) <= 1
+        and len({found for found, _ in find_event_times(description)}) <= 1
+    )
+
+    note_data = {
+        'title': ' '.join(title_words) or 'Generated Note',
+        'content': _expand_shorthand(description),
+        'category': category or '',
+        'tags': ', '.join(tags),
+        'event_date': event_date,
+        'event_time': event_time
+    }
+    return note_data, confident
+
+
+# A function to check LLM date/time output against the local rules
+def correct_event_fields(note_data, description, today=None):
+    """
+    Validate the event date/time produced by the LLM.
+
+    When the description mentions exactly one date (or time), the value the
+    local rules resolve for it takes precedence. With no mention, or several,
+    the LLM's value is kept if it is well formed and cleared otherwise.
+
+    Args:
+        note_data (dict): Note in database format (modified in place)
+        description (str): The original user description
+        today (date): Reference date for relative dates (default: today)
+
+    Returns:
+        dict: The corrected note_data
+    """
+    local_dates = {found for found, _ in find_event_dates(description, today)}
+    local_times = {found for found, _ in find_event_times(description)}
+
+    if len(local_dates) == 1:
+        note_data['event_date'] = local_dates.pop()
+    elif not _is_valid(note_data.get('event_date'), '%Y-%m-%d'):
+        note_data['event_date'] = None
+
+    if len(local_times) == 1:
+        note_data['event_time'] = local_times.pop()
+    elif not _is_valid(note_data.get('event_time'), '%H:%M'):
+        note_data['event_time'] = None
+
+    return note_data
+
+
+def _date_mentions(text, today):
+    # Yields (date, span) for every match, most explicit patterns first
+    for match in _ISO_DATE.finditer(text):
+        found = _safe_date(int(match.group(1)), int(match.group(2)), int(match.group(3)))
+        if found:
+            yield found.isoformat(), match.span()
+
+    for match in _RELATIVE_DAY.finditer(text):
+        word = match.group(1).lower()
+        if word.startswith('day after'):
+            offset = 2
+        elif word in ('today', 'tdy', 'tonight'):
+            offset = 0
+        else:
+            offset = 1
+        yield (today + timedelta(days=offset)).isoformat(), match.span()
+
+    for pattern, month_group, day_group, suffix_group in ((_MONTH_DAY, 1, 2, 3), (_DAY_MONTH, 3, 1, 2)):
+        for match in pattern.finditer(text):
+            month = match.group(month_group)
+            if month.lower() in AMBIGUOUS_MONTHS and not month[0].isupper() and not match.group(suffix_group):
+                continue
+            # Current year if not specified
+            found = _safe_date(today.year, MONTHS[month.lower()], int(match.group(day_group)))
+            if found:
+                yield found.isoformat(), match.span()
+
+    for pattern in (_WEEKDAY, _WEEKDAY_SHORT):
+        for match in pattern.finditer(text):
+            qualifier = (match.group(1) or '').lower()
+            target = _weekday_index(match.group(2).lower())
+            days_ahead = (target - today.weekday()) % 7
+            # "this Friday" may be today; "Friday" and "next Friday" mean the next occurrence
+            if days_ahead == 0 and qualifier != 'this':
+                days_ahead = 7
+            yield (today + timedelta(days=days_ahead)).isoformat(), match.span()
+
+
+def _time_mentions(text):
+    # Yields (time, span) for every match, am/pm times first
+    for match in _TIME_12H.finditer(text):
+        hour = int(match.group(1))
+        minute = int(match.group(2) or 0)
+        if 1 <= hour <= 12:
+            hour = hour % 12 + (12 if match.group(3).lower() == 'pm' else 0)
+            yield f"{hour:02d}:{minute:02d}", match.span()
+
+    for match in _TIME_24H.finditer(text):
+        yield f"{int(match.group(1)):02d}:{match.group(2)}", match.span()
+
+    for match in _TIME_WORD.finditer(text):
+        yield ('12:00' if match.group(1).lower() == 'noon' else '00:00'), match.span()
+
+
+def _in_reading_order(mentions):
+    # Drop mentions overlapping an earlier (more explicit) one, then sort by position
+    kept = []
+    for found, span in mentions:
+        if all(span[1] <= other[0] or span[0] >= other[1] for _, other in kept):
+            kept.append((found, span))
+    return sorted(kept, key=lambda mention: mention[1])
+
+
+def _safe_date(year, month, day):
+    try:
+        return date(year, month, day)
+    except ValueError:
+        return None
+
+
+def _weekday_index(name):
+    for index, day in enumerate(WEEKDAYS):
+        if day.startswith(name):
+            return index
+    return None
+
+
+def _is_valid(value, fmt):
+    if not isinstance(value, str):
+        return False
+    try:
+        datetime.strptime(value, fmt)
+        return True
+    except ValueError:
+        return False
+
+
+def _title_words(words):
+    title = []
+    for word in words:
+        if word.startswith('@'):
+            title += ['at', word[1:]]
+        else:
+            title.append(word)
+
+    # Drop prepositions left dangling by removed date/time phrases
+    while title and title[-1].lower() in ('at', 'on', 'by', 'in'):
+        title.pop()
+
+    return [word if word.lower() == 'at' or not word.islower() else word.capitalize() for word in title]
+
+
+def _pick_category(matches):
+    if not matches:
+        return None
+    votes = {}
+    for category, _ in matches:
+        votes[category] = votes.get(category, 0) + 1
+    # Most votes wins, earliest mention breaks ties
+    best = None
+    for category, _ in matches:
+        if best is None or votes[category] > votes[best]:
+            best = category
+    return best
+
+
+def _pick_tags(matches, matched_words):
+    tags = []
+    for _, tag in matches:
+        if tag not in tags:
+            tags.append(tag)
+    # A single generic tag says little, add the keyword itself
+    for word in matched_words:
+        if len(tags) >= 2:
+            break
+        if word not in tags:
+            tags.append(word)
+    return tags[:3]
+
+
+def _expand_shorthand(description):
+    # The user's own words, with shorthand spelled out. Rules cannot write
+    # the full sentences the LLM does, so the text is not rephrased.
+    words = []
+    for word in description.split():
+        if word.startswith('@') and len(word) > 1:
+            words += ['at', word[1:]]
+        else:
+            words.append(SHORTHAND.get(word.lower(), word))
+    return ' '.join(words)
@@ -0,0 +1,203 @@
+"""
+Search Suggestion Module
+In-memory prefix index over note titles, tags and categories for
+search-box autocomplete
+"""
+import heapq
+import threading
+import time
+from bisect import bisect_left, insort
+from functools import cmp_to_key
+
+from backend.sync import fetch_changes
+
+# Seconds before the index pulls changes made by other processes
+SUGGEST_REFRESH_INTERVAL = 60
+
+# Seconds to wait before retrying after a failed refresh
+SUGGEST_RETRY_INTERVAL = 15
+
+# Columns needed to index a note (change_seq drives incremental refresh)
+SUGGEST_COLUMNS = 'id, title, tags, category, updated_at, change_seq'
+
+
+class SuggestIndex:
+    """
+    Sorted array of lowercase match keys, searched with bisect.
+
+    Every title, tag and category is a term. Tags and categories match from
+    their start; titles also match from the start of each word, so "pol"
+    suggests "Badminton at PolyU". Each term remembers which notes use it
+    and when they were last updated, for ranking by frequency and recency.
+    """
+
+    def __init__(self):
+        self._keys = []           # sorted (match_key, kind, term) tuples
+        self._terms = {}          # (kind, term) -> {'text': str, 'notes': {note_id: updated_at}}
+        self._note_terms = {}     # note_id -> set of (kind, term)
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._next_refresh_at = 0.0
+        self.token = None         # delta sync token, None until first load
+
+    def upsert_note(self, note):
+        """Index a new or updated note, replacing its previous terms."""
+        with self._lock:
+            self._remove_note(note['id'])
+            terms = set()
+            for kind, text in _note_terms(note):
+                term_id = (kind, text.lower())
+                terms.add(term_id)
+                self._add_term(term_id, text, note['id'], note.get('updated_at') or '')
+            self._note_terms[note['id']] = terms
+
+    def remove_note(self, note_id):
+        """Drop a deleted note from the index."""
+        with self._lock:
+            self._remove_note(note_id)
+
+    def suggest(self, prefix, limit=8):
+        """
+        Return up to `limit` terms starting with prefix (case-insensitive),
+        most used first, then most recently updated.
+        """
+        prefix = prefix.strip().lower()
+        if not prefix or limit < 1:
+            return []
+
+        with self._lock:
+            # Walk every key with the prefix, a title matches once per word
+            candidates = set()
+            index = bisect_left(self._keys, (prefix,))
+            while index < len(self._keys) and self._keys[index][0].startswith(prefix):
+                _, kind, term = self._keys[index]
+                candidates.add((kind, term))
+                index += 1
+
+            ranked = []
+            for term_id in candidates:
+                entry = self._terms[term_id]
+                ranked.append((len(entry['notes']), max(entry['notes'].values()), entry['text'], term_id[0]))
+
+        # Bounded heap: only the best `limit` terms are ever fully ordered
+        best = heapq.nsmallest(limit, ranked, key=cmp_to_key(_compare_ranked))
+        return [{'text': text, 'type': kind, 'count': count} for count, _, text, kind in best]
+
+    def refresh_if_stale(self, client):
+        """
+        Load the index on first use and, at most every
+        SUGGEST_REFRESH_INTERVAL seconds, apply changes made elsewhere
+        (other workers, other clients) using the delta sync feed.
+        After a failure the next attempt waits SUGGEST_RETRY_INTERVAL seconds.
+        """
+        if self.is_stale():
+            self.refresh(client)
+
+    def refresh(self, client):
+        """
+        Apply every change since the last refresh (everything on first use).
+        Only one thread refreshes at a time; the others return at once and
+        keep serving the current index.
+        """
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+
+        try:
+            since = int(self.token or 0)
+            while True:
+                changes = fetch_changes(client, since, columns=SUGGEST_COLUMNS)
+                if changes['reset']:
+                    self.clear()
+                for note in changes['notes']:
+                    self.upsert_note(note)
+                for note_id in changes['deleted']:
+                    self.remove_note(note_id)
+                since = int(changes['token'])
+                # Keep each page, a retry after a failure resumes from here
+                self.token = str(since)
+                if not changes['has_more']:
+                    break
+            self._next_refresh_at = time.monotonic() + SUGGEST_REFRESH_INTERVAL
+        except Exception:
+            self._next_refresh_at = time.monotonic() + SUGGEST_RETRY_INTERVAL
+            raise
+        finally:
+            self._refresh_lock.release()
+
+    def refresh_in_background(self, client):
+        """
+        Start refresh_if_stale on a background thread if the index is stale,
+        so lookups never wait for the database.
+        """
+        if not self.is_stale() or self._refresh_lock.locked():
+            return
+        threading.Thread(target=self._refresh_logged, args=(client,), name='suggest-refresh', daemon=True).start()
+
+    def is_stale(self):
+        """True if the index is due for a refresh."""
+        return time.monotonic() >= self._next_refresh_at
+
+    def clear(self):
+        """Empty the index."""
+        with self._lock:
+            self._keys = []
+            self._terms = {}
+            self._note_terms = {}
+
+    def _refresh_logged(self, client):
+        try:
+            self.refresh_if_stale(client)
+        except Exception as e:
+            print(f"Error refreshing suggest index: {e}")
+
+    def _add_term(self, term_id, text, note_id, updated_at):
+        entry = self._terms.get(term_id)
+        if entry is None:
+            entry = {'text': text, 'notes': {}}
+            self._terms[term_id] = entry
+            for key in _match_keys(term_id):
+                insort(self._keys, key)
+        entry['notes'][note_id] = updated_at
+
+    def _remove_note(self, note_id):
+        for term_id in self._note_terms.pop(note_id, ()):
+            entry = self._terms[term_id]
+            entry['notes'].pop(note_id, None)
+            if entry['notes']:
+                continue
+            del self._terms[term_id]
+            for key in _match_keys(term_id):
+                index = bisect_left(self._keys, key)
+                if index < len(self._keys) and self._keys[index] == key:
+                    del self._keys[index]
+
+
+def _note_terms(note):
+    if (note.get('title') or '').strip():
+        yield 'title', note['title'].strip()
+    if (note.get('category') or '').strip():
+        yield 'category', note['category'].strip()
+    for tag in (note.get('tags') or '').split(','):
+        if tag.strip():
+            yield 'tag', tag.strip()
+
+
+def _compare_ranked(a, b):
+    # Most used first, then most recently updated, then alphabetical
+    for x, y in ((b[0], a[0]), (b[1], a[1]), (a[2].lower(), b[2].lower())):
+        if x != y:
+            return -1 if x < y else 1
+    return 0
+
+
+def _match_keys(term_id):
+    kind, term = term_id
+    if kind != 'title':
+        return [(term, kind, term)]
+    # Match titles from the start of every word
+    words = term.split()
+    return [(' '.join(words[i:]), kind, term) for i in range(len(words))]
+
+
+# Shared index used by the /api/suggest route
+suggest_index = SuggestIndex()
@@ -0,0 +1,124 @@
+"""
+Delta Sync Module
+Serves incremental note changes using the change sequence maintained in Supabase
+"""
+import time
+
+# Maximum number of changes (notes + deleted ids) returned per sync page
+SYNC_PAGE_SIZE = 500
+
+# Tombstones older than this are purged by compaction
+TOMBSTONE_RETENTION_DAYS = 30
+
+# Minimum seconds between two compaction runs in the same process
+COMPACTION_INTERVAL = 3600
+
+_last_compaction = 0.0
+
+
+# A function to parse a sync token sent by a client
+def parse_sync_token(token):
+    """
+    Parse a sync token into a change sequence number.
+
+    Args:
+        token (str): Token returned by a previous sync, or empty for a full sync
+
+    Returns:
+        int: Change sequence the client has already seen
+
+    Raises:
+        ValueError: If the token is not a non-negative integer
+    """
+    if token is None or token == '':
+        return 0
+
+    since = int(token)
+    if since < 0:
+        raise ValueError("Sync token must not be negative")
+    return since
+
+
+# A function to fetch all changes after a given sequence number
+def fetch_changes(client, since, limit=SYNC_PAGE_SIZE, columns='*'):
+    """
+    Fetch notes written and ids deleted after the given change sequence.
+
+    Notes carry a `change_seq` column and deletes leave a row in
+    `note_tombstones`; both are stamped from the same database sequence by the
+    `notes_track_change` trigger, so merging the two streams in sequence order
+    gives the exact order of writes. The trigger serializes writers, so a
+    number only becomes visible after every lower one has committed and a
+    token never skips a change that commits later.
+
+    Args:
+        client: Supabase client
+        since (int): Last change sequence seen by the client (0 = full sync)
+        limit (int): Maximum number of changes to return
+        columns (str): Note columns to return (must include change_seq)
+
+    Returns:
+        dict: notes, deleted ids, next token, has_more and reset flags
+    """
+    if since > 0:
+        changes = _read_changes(client, since, limit, columns, with_tombstones=True)
+        # Tombstones up to compacted_through are gone, so a client that far
+        # behind cannot learn about those deletes and has to start over.
+        # Checked after the tombstone read: compaction running between the
+        # two reads must not go unnoticed.
+        state = client.table('note_sync_state').select('compacted_through').eq('id', 1).execute()
+        compacted_through = state.data[0]['compacted_through'] if state.data else 0
+        if since >= compacted_through:
+            return dict(changes, reset=False)
+
+    # A full sync starts from an empty client, so deletes are irrelevant
+    changes = _read_changes(client, 0, limit, columns, with_tombstones=False)
+    return dict(changes, reset=since > 0)
+
+
+def _read_changes(client, since, limit, columns, with_tombstones):
+    notes = client.table('notes').select(columns).gt('change_seq', since).order('change_seq').limit(limit + 1).execute().data
+
+    tombstones = []
+    if with_tombstones:
+        tombstones = client.table('note_tombstones').select('note_id, change_seq').gt('change_seq', since).order('change_seq').limit(limit + 1).execute().data
+
+    changes = [(note['change_seq'], note, None) for note in notes]
+    changes += [(tombstone['change_seq'], None, tombstone['note_id']) for tombstone in tombstones]
+    changes.sort(key=lambda change: change[0])
+
+    page = changes[:limit]
+    token = page[-1][0] if page else since
+
+    return {
+        'notes': [note for _, note, _ in page if note is not None],
+        'deleted': [note_id for _, _, note_id in page if note_id is not None],
+        'token': str(token),
+        'has_more': len(changes) > limit
+    }
+
+
+# A function to purge old tombstones at most once per interval
+def maybe_compact_tombstones(client):
+    """
+    Purge tombstones older than the retention window.
+
+    Runs the `compact_note_tombstones` database function, which also records
+    the purged sequence range so stale clients are told to resync.
+    Does nothing if compaction already ran within COMPACTION_INTERVAL.
+
+    Args:
+        client: Supabase client
+
+    Returns:
+        int: Number of tombstones purged (0 if skipped)
+    """
+    global _last_compaction
+
+    now = time.monotonic()
+    if _last_compaction and now - _last_compaction < COMPACTION_INTERVAL:
+        return 0
+    _last_compaction = now
+
+    response = client.rpc('compact_note_tombstones', {'retention_days': TOMBSTONE_RETENTION_DAYS}).execute()
+    return response.data or 0
@@ -0,0 +1,167 @@
+"""
+Translation Memory Module
+Translates text sentence by sentence, reusing stored translations so only
+new or edited sentences are sent to the LLM
+"""
+import hashlib
+import json
+import re
+
+from backend.llm import call_llm_model, translate_text, model as default_model
+from backend.llm_scheduler import INTERACTIVE
+
+# Maximum number of segment hashes per memory lookup
+LOOKUP_CHUNK_SIZE = 100
+
+# Sentence boundary: western punctuation followed by whitespace, or CJK punctuation
+_SENTENCE_BREAK = re.compile(r'[.!?]+["\')\]]*\s+|[。！？]+')
+
+# Line breaks (with surrounding whitespace) separate paragraphs and list items
+_LINE_BREAK = re.compile(r'(\s*\n\s*)')
+
+
+# A function to split text into translatable segments and separators
+def segment_text(text):
+    """
+    Split text into sentences, keeping the whitespace between them.
+
+    Args:
+        text (str): Text to split
+
+    Returns:
+        list: (is_segment, text) pairs; joining every text gives back the input
+    """
+    parts = []
+    for block in _LINE_BREAK.split(text):
+        if not block:
+            continue
+        if block.isspace():
+            parts.append((False, block))
+            continue
+
+        start = 0
+        for match in _SENTENCE_BREAK.finditer(block):
+            _add_piece(parts, block[start:match.end()])
+            start = match.end()
+        if start < len(block):
+            _add_piece(parts, block[start:])
+
+    return parts
+
+
+# A function to translate text using the translation memory
+def translate_with_memory(client, text, target_language="Chinese", model_name=None, priority=INTERACTIVE):
+    """
+    Translate text, reusing stored sentence translations.
+
+    Sentences already in the `translation_memory` table are reused; the rest
+    are translated together in one LLM call and stored. Whitespace and line
+    breaks between sentences are kept as they are.
+
+    Args:
+        client: Supabase client used as the persistent store
+        text (str): Text to translate
+        target_language (str): Target language (default: Chinese)
+        model_name (str): Optional model override
+        priority (int): INTERACTIVE (default) or BACKGROUND
+
+    Returns:
+        str: Translated text
+    """
+    model_name = model_name or default_model
+    parts = segment_text(text)
+    segments = list(dict.fromkeys(piece for is_segment, piece in parts if is_segment))
+    if not segments:
+        return text
+
+    hashes = {segment: _segment_hash(segment) for segment in segments}
+    known = _load_translations(client, list(hashes.values()), target_language, model_name)
+
+    missing = [segment for segment in segments if hashes[segment] not in known]
+    if missing:
+        translated = _translate_batch(missing, target_language, model_name, priority)
+        if translated is None:
+            # The model did not keep the batch format, translate the whole text instead
+            return translate_text(text, target_language, priority=priority)
+
+        rows = []
+        for segment, translation in zip(missing, translated):
+            known[hashes[segment]] = translation
+            rows.append({
+                'source_hash': hashes[segment],
+                'target_language': target_language,
+                'model': model_name,
+                'source_text': segment,
+                'translation': translation
+            })
+        _store_translations(client, rows)
+
+    return ''.join(known[hashes[piece]] if is_segment else piece for is_segment, piece in parts)
+
+
+def _add_piece(parts, piece):
+    # Keep surrounding whitespace out of the segment so edits to spacing don't miss the memory
+    stripped = piece.strip()
+    if not stripped:
+        parts.append((False, piece))
+        return
+    leading = piece[:len(piece) - len(piece.lstrip())]
+    trailing = piece[len(piece.rstrip()):]
+    if leading:
+        parts.append((False, leading))
+    parts.append((True, stripped))
+    if trailing:
+        parts.append((False, trailing))
+
+
+def _segment_hash(segment):
+    return hashlib.sha256(segment.encode('utf-8')).hexdigest()
+
+
+def _load_translations(client, hashes, target_language, model_name):
+    known = {}
+    try:
+        # Hashes go in the query string, so look them up in chunks
+        for start in range(0, len(hashes), LOOKUP_CHUNK_SIZE):
+            response = client.table('translation_memory').select('source_hash, translation') \
+                .in_('source_hash', hashes[start:start + LOOKUP_CHUNK_SIZE]) \
+                .eq('target_language', target_language).eq('model', model_name).execute()
+            known.update({row['source_hash']: row['translation'] for row in response.data})
+    except Exception as e:
+        print(f"Error loading translation memory: {e}")
+    return known
+
+
+def _store_translations(client, rows):
+    try:
+        client.table('translation_memory').upsert(rows, on_conflict='source_hash,target_language,model').execute()
+    except Exception as e:
+        print(f"Error storing translation memory: {e}")
+
+
+def _translate_batch(segments, target_language, model_name, priority):
+    messages = [
+        {
+            "role": "system",
+            "content": f"You are a professional translator. Translate each string in the JSON array to {target_language}. Return only a JSON array of the translated strings in the same order, with exactly {len(segments)} items. No explanations."
+        },
+        {
+            "role": "user",
+            "content": json.dumps(segments, ensure_ascii=False)
+        }
+    ]
+
+    response_text = call_llm_model(messages, temperature=0.3, model_name=model_name, priority=priority)
+
+    start_idx = response_text.find('[')
+    end_idx = response_text.rfind(']') + 1
+    if start_idx == -1 or end_idx <= start_idx:
+        return None
+    try:
+        translated = json.loads(response_text[start_idx:end_idx])
+    except ValueError:
+        return None
+
+    if len(translated) != len(segments) or not all(isinstance(item, str) for item in translated):
+        return None
+    return [item.strip() for item in translated]
@@ -29,6 +29,14 @@ document.addEventListener('DOMContentLoaded', function() {
         searchInput.addEventListener('blur', function() {
             this.parentElement.style.transform = 'scale(1)';
         });
+
+        // Autocomplete titles, tags and categories while typing
+        let suggestTimer = null;
+        searchInput.addEventListener('input', function() {
+            clearTimeout(suggestTimer);
+            const prefix = this.value.trim();
+            suggestTimer = setTimeout(() => loadSuggestions(prefix), 150);
+        });
     }
 
     // Form validation
@@ -87,6 +95,46 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
+// Fetch search suggestions for a prefix and fill the datalist
+let suggestController = null;
+
+async function loadSuggestions(prefix) {
+    const datalist = document.getElementById('searchSuggestions');
+    if (!datalist) {
+        return;
+    }
+
+    // Drop the previous request, its answer would be for an older prefix
+    if (suggestController) {
+        suggestController.abort();
+    }
+
+    if (!prefix) {
+        datalist.innerHTML = '';
+        return;
+    }
+
+    suggestController = new AbortController();
+    try {
+        const response = await fetch(`/api/suggest?prefix=${encodeURIComponent(prefix)}`, {
+            signal: suggestController.signal
+        });
+        const data = await response.json();
+
+        datalist.innerHTML = '';
+        if (data.success) {
+            data.suggestions.forEach(suggestion => {
+                const option = document.createElement('option');
+                option.value = suggestion.text;
+                option.label = suggestion.type;
+                datalist.appendChild(option);
+            });
+        }
+    } catch (error) {
+        // Aborted or offline: suggestions are optional, keep typing working
+    }
+}
+
 // Function to format date
 function formatDate(dateString) {
     const date = new Date(dateString);
@@ -0,0 +1,58 @@
+"""
+Gunicorn configuration for production serving (non-Vercel deployments).
+Start with: python run.py --prod
+       or: gunicorn --config gunicorn.conf.py run:app
+
+Every setting can be overridden with the environment variables below.
+
+Reloading:
+- kill -HUP <master pid>   restarts workers gracefully with the new config
+- Because the app is preloaded, code changes need a new master:
+  kill -USR2 <master pid>, then kill -QUIT <old master pid> once the new one is up
+"""
+import multiprocessing
+import os
+
+# Listen on all interfaces, PORT is set by most hosting platforms
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Sizing: (2 x CPU cores) + 1 processes, each with a few threads because
+# LLM and Supabase calls spend most of their time waiting on the network
+workers = int(os.getenv('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+
+# The LLM scheduler is per worker. Keep its upstream limit and queue below
+# the thread count, otherwise every call starts at once and priorities,
+# the bounded queue and 503 rejection never apply. This file is read before
+# the app is imported, so backend/llm.py picks these up.
+os.environ.setdefault('LLM_MAX_CONCURRENCY', str(max(1, threads // 2)))
+os.environ.setdefault('LLM_MAX_QUEUE', str(max(1, threads - int(os.environ['LLM_MAX_CONCURRENCY']) - 1)))
+
+# Import the app once in the master and fork workers from it
+preload_app = True
+
+# Recycle each worker after a number of requests (jittered so they don't
+# all restart together) to cap memory growth from caches and leaks
+max_requests = int(os.getenv('GUNICORN_MAX_REQUESTS', '1000'))
+max_requests_jitter = int(os.getenv('GUNICORN_MAX_REQUESTS_JITTER', '100'))
+
+# LLM calls can take several seconds
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+graceful_timeout = int(os.getenv('GUNICORN_GRACEFUL_TIMEOUT', '30'))
+keepalive = 5
+
+accesslog = '-'
+errorlog = '-'
+
+
+def when_ready(server):
+    """Runs in the master after the app is loaded, before workers are forked"""
+    import run
+    run.warmup()
+
+
+def post_worker_init(worker):
+    """Runs in each worker after it is forked"""
+    import run
+    run.warmup_worker()
@@ -7,6 +7,7 @@ Run this once before starting your application.
 from supabase import create_client, Client
 import os
 from dotenv import load_dotenv
+from migrate import load_migrations
 
 # Load environment variables
 load_dotenv()
@@ -29,41 +30,13 @@ def init_supabase_db():
         
         print("\n⚠️  Note: Table creation requires SQL Editor access in Supabase Dashboard")
         print("=" * 70)
-        print("\n📋 Please run the following SQL in your Supabase SQL Editor:")
+        print("\n💡 With DATABASE_URL set in .env, `python migrate.py` applies this for you.")
+        print("\n📋 Otherwise, run the following SQL in your Supabase SQL Editor:")
         print("   (Dashboard → SQL Editor → New Query)")
         print("\n" + "-" * 70)
         
-        sql_script = """
--- Create notes table
-CREATE TABLE IF NOT EXISTS notes (
-    id SERIAL PRIMARY KEY,
-    title TEXT NOT NULL,
-    content TEXT NOT NULL,
-    category TEXT,
-    tags TEXT,
-    event_date DATE,
-    event_time TIME,
-    created_at TIMESTAMP DEFAULT NOW(),
-    updated_at TIMESTAMP DEFAULT NOW()
-);
-
--- Create indexes for better performance
-CREATE INDEX IF NOT EXISTS idx_notes_updated_at ON notes(updated_at DESC);
-CREATE INDEX IF NOT EXISTS idx_notes_event_date ON notes(event_date DESC);
-CREATE INDEX IF NOT EXISTS idx_notes_created_at ON notes(created_at DESC);
-CREATE INDEX IF NOT EXISTS idx_notes_title ON notes(title);
-
--- Enable Row Level Security (optional, for future use)
-ALTER TABLE notes ENABLE ROW LEVEL SECURITY;
-
--- Create policy to allow all operations (for development)
--- You can customize this later for user-specific access
-DROP POLICY IF EXISTS "Allow all operations for notes" ON notes;
-CREATE POLICY "Allow all operations for notes" 
-ON notes FOR ALL 
-USING (true) 
-WITH CHECK (true);
-"""
+        # Same SQL as the migrations applied by migrate.py
+        sql_script = '\n'.join(migration['sql'] for migration in load_migrations())
         
         print(sql_script)
         print("-" * 70)
@@ -0,0 +1,306 @@
+"""
+Database Migration Runner
+Applies the numbered SQL files in migrations/ to a PostgreSQL database
+(Supabase or a local server) and checks that every query the app runs is
+served by an index.
+
+Usage:
+    python migrate.py                  # apply pending migrations to DATABASE_URL
+    python migrate.py --status         # list applied and pending migrations
+    python migrate.py --check-plans    # EXPLAIN every app query on TEST_DATABASE_URL
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+MIGRATIONS_DIR = os.path.join(BASE_DIR, 'migrations')
+
+# Migration files are named like 0003_delta_sync.sql
+MIGRATION_FILE = re.compile(r'^(\d{4})_(\w+)\.sql$')
+
+# Rows inserted before running EXPLAIN, so the planner sees a realistic table
+SEED_ROWS = 5000
+
+# Lock id shared by every runner, so two deploys never migrate at once
+MIGRATION_LOCK_ID = 5421
+
+# Query shapes used by backend/app.py, with the indexes that must serve them.
+# Each entry: (name, SQL, indexes that must appear in the plan, sort allowed)
+SEARCH_FILTER = ("title ILIKE '%meet%' OR content ILIKE '%meet%' "
+                 "OR category ILIKE '%meet%' OR tags ILIKE '%meet%'")
+SEARCH_INDEXES = ['idx_notes_title_trgm', 'idx_notes_content_trgm', 'idx_notes_category_trgm', 'idx_notes_tags_trgm']
+
+QUERY_CHECKS = [
+    # index() and api_notes(): order must come straight from an index
+    ('index sort=updated', "SELECT * FROM notes ORDER BY updated_at DESC", ['idx_notes_updated_at'], False),
+    ('index sort=created', "SELECT * FROM notes ORDER BY created_at DESC", ['idx_notes_created_at'], False),
+    ('index sort=title', "SELECT * FROM notes ORDER BY title ASC", ['idx_notes_title'], False),
+    ('index sort=event_date', "SELECT * FROM notes ORDER BY event_date ASC NULLS LAST, event_time ASC", ['idx_notes_event_date_time'], False),
+    ('index sort=event_time', "SELECT * FROM notes ORDER BY event_time ASC NULLS LAST, event_date ASC", ['idx_notes_event_time_date'], False),
+
+    # search(): the filter must use the trigram indexes, matches are then sorted
+    ('search sort=updated', f"SELECT * FROM notes WHERE {SEARCH_FILTER} ORDER BY updated_at DESC", SEARCH_INDEXES, True),
+    ('search sort=created', f"SELECT * FROM notes WHERE {SEARCH_FILTER} ORDER BY created_at DESC", SEARCH_INDEXES, True),
+    ('search sort=title', f"SELECT * FROM notes WHERE {SEARCH_FILTER} ORDER BY title ASC", SEARCH_INDEXES, True),
+    ('search sort=event_date', f"SELECT * FROM notes WHERE {SEARCH_FILTER} ORDER BY event_date DESC, event_time DESC", SEARCH_INDEXES, True),
+    ('search sort=event_time', f"SELECT * FROM notes WHERE {SEARCH_FILTER} ORDER BY event_time DESC, event_date DESC", SEARCH_INDEXES, True),
+
+    # view_note() / edit_note() / update_note_if_version()
+    ('view note', "SELECT * FROM notes WHERE id = 42", ['notes_pkey'], False),
+    ('update note if version', "UPDATE notes SET title = 'x' WHERE id = 42 AND version = 1", ['notes_pkey'], False),
+    ('delete note', "DELETE FROM notes WHERE id = 42", ['notes_pkey'], False),
+
+    # api_sync() and tombstone compaction
+    ('sync notes', "SELECT * FROM notes WHERE change_seq > 100 ORDER BY change_seq LIMIT 501", ['idx_notes_change_seq'], False),
+    ('sync tombstones', "SELECT note_id, change_seq FROM note_tombstones WHERE change_seq > 100 ORDER BY change_seq LIMIT 501", ['idx_note_tombstones_change_seq'], False),
+    ('sync state', "SELECT compacted_through FROM note_sync_state WHERE id = 1", ['note_sync_state_pkey'], False),
+    ('compact tombstones', "SELECT MAX(change_seq) FROM note_tombstones WHERE deleted_at < NOW() - INTERVAL '30 days'", ['idx_note_tombstones_deleted_at'], False),
+
+    # translate_with_memory()
+    ('translation memory lookup', "SELECT source_hash, translation FROM translation_memory "
+                                  "WHERE source_hash IN ('a', 'b', 'c') AND target_language = 'Chinese' AND model = 'gpt-4o-mini'",
+     ['translation_memory_pkey'], False),
+]
+
+SEED_SQL = """
+INSERT INTO notes (title, content, category, tags, event_date, event_time)
+SELECT
+    'Note ' || g || ' ' || (ARRAY['meeting', 'badminton', 'groceries', 'exam', 'flight'])[1 + g % 5],
+    repeat('Lorem ipsum dolor sit amet. ', 1 + g % 7) || g,
+    (ARRAY['Work', 'Personal', 'Shopping', 'Study', 'Travel'])[1 + g % 5],
+    (ARRAY['work, meeting', 'sports', 'groceries, shopping', 'exam', 'travel'])[1 + g % 5],
+    CASE WHEN g % 3 = 0 THEN NULL ELSE DATE '2025-01-01' + (g % 365) END,
+    CASE WHEN g % 4 = 0 THEN NULL ELSE TIME '08:00' + (g % 600) * INTERVAL '1 minute' END
+FROM generate_series(1, {rows}) AS g;
+
+DELETE FROM notes WHERE id % 10 = 0;
+
+INSERT INTO translation_memory (source_hash, target_language, model, source_text, translation)
+SELECT md5(g::text), 'Chinese', 'gpt-4o-mini', 'Sentence ' || g, '句子 ' || g
+FROM generate_series(1, {rows}) AS g;
+
+ANALYZE notes;
+ANALYZE note_tombstones;
+ANALYZE translation_memory;
+"""
+
+
+# A function to read the migration files in order
+def load_migrations():
+    """
+    Load all migration files from the migrations folder.
+
+    Returns:
+        list: Dicts with version, name, sql and checksum, sorted by version
+    """
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, filename), encoding='utf-8') as f:
+            sql = f.read()
+        migrations.append({
+            'version': int(match.group(1)),
+            'name': match.group(2),
+            'sql': sql,
+            'checksum': hashlib.sha256(sql.encode('utf-8')).hexdigest()
+        })
+    return migrations
+
+
+# A function to open a direct PostgreSQL connection
+def connect(database_url):
+    """
+    Connect to PostgreSQL. Migrations need DDL, which the Supabase client
+    cannot run, so this uses psycopg2 with the database connection string.
+    """
+    import psycopg2
+    return psycopg2.connect(database_url)
+
+
+# A function to read which migrations a database already has
+def get_applied_migrations(conn):
+    """
+    Return {version: checksum} for every applied migration.
+    Creates the schema_migrations bookkeeping table if needed.
+    """
+    with conn, conn.cursor() as cur:
+        cur.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name TEXT NOT NULL,
+                checksum TEXT NOT NULL,
+                applied_at TIMESTAMP DEFAULT NOW()
+            )
+        """)
+        cur.execute("SELECT version, checksum FROM schema_migrations")
+        return dict(cur.fetchall())
+
+
+# A function to apply every pending migration
+def apply_migrations(conn):
+    """
+    Apply pending migrations in order, each in its own transaction.
+
+    Returns:
+        list: Versions applied by this run
+
+    Raises:
+        RuntimeError: If an applied migration file was edited afterwards
+    """
+    applied = get_applied_migrations(conn)
+    migrations = load_migrations()
+    newly_applied = []
+
+    # An edited migration never reruns, so the database would silently differ from the file
+    changed = [f"{m['version']:04d}_{m['name']}" for m in migrations
+               if m['version'] in applied and applied[m['version']] != m['checksum']]
+    if changed:
+        raise RuntimeError(
+            f"Migration file changed after it was applied: {', '.join(changed)}. "
+            "Restore the file and put the change in a new migration."
+        )
+
+    for migration in migrations:
+        if migration['version'] in applied:
+            continue
+
+        with conn, conn.cursor() as cur:
+            cur.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_ID,))
+            # Another runner may have applied it while we waited for the lock
+            cur.execute("SELECT 1 FROM schema_migrations WHERE version = %s", (migration['version'],))
+            if cur.fetchone():
+                continue
+            cur.execute(migration['sql'])
+            cur.execute(
+                "INSERT INTO schema_migrations (version, name, checksum) VALUES (%s, %s, %s)",
+                (migration['version'], migration['name'], migration['checksum'])
+            )
+
+        print(f"✓ Applied {migration['version']:04d}_{migration['name']}")
+        newly_applied.append(migration['version'])
+
+    return newly_applied
+
+
+# A function to print applied and pending migrations
+def print_status(conn):
+    """Print each migration as applied, pending or changed since it was applied"""
+    applied = get_applied_migrations(conn)
+    for migration in load_migrations():
+        label = f"{migration['version']:04d}_{migration['name']}"
+        if migration['version'] not in applied:
+            print(f"  pending   {label}")
+        elif applied[migration['version']] != migration['checksum']:
+            print(f"  CHANGED   {label} (file edited after it was applied)")
+        else:
+            print(f"  applied   {label}")
+
+
+# A function to EXPLAIN every app query on seeded data
+def check_query_plans(conn, rows=SEED_ROWS):
+    """
+    Seed the database, EXPLAIN every query in QUERY_CHECKS and report the
+    ones not served by their index. Sequential scans are disabled for the
+    check, so a Seq Scan in a plan means no usable index exists. Seed data
+    is rolled back afterwards.
+
+    Returns:
+        list: Failure messages (empty if every query uses its index)
+    """
+    failures = []
+    try:
+        with conn.cursor() as cur:
+            cur.execute(SEED_SQL.format(rows=int(rows)))
+            cur.execute("SET LOCAL enable_seqscan = off")
+
+            for name, sql, indexes, sort_allowed in QUERY_CHECKS:
+                cur.execute(f"EXPLAIN (FORMAT JSON) {sql}")
+                plan = cur.fetchone()[0]
+                if isinstance(plan, str):
+                    plan = json.loads(plan)
+                node_types, index_names = _walk_plan(plan[0]['Plan'])
+
+                problems = []
+                if 'Seq Scan' in node_types:
+                    problems.append('sequential scan')
+                missing = [index for index in indexes if index not in index_names]
+                if missing:
+                    problems.append('not using ' + ', '.join(missing))
+                if not sort_allowed and ({'Sort', 'Incremental Sort'} & node_types):
+                    problems.append('sorts instead of reading the index in order')
+
+                if problems:
+                    failures.append(f"{name}: {'; '.join(problems)}")
+                    print(f"  ❌ {name}: {'; '.join(problems)}")
+                else:
+                    print(f"  ✓ {name}")
+    finally:
+        conn.rollback()
+
+    return failures
+
+
+def _walk_plan(node):
+    node_types = {node['Node Type']}
+    index_names = {node['Index Name']} if 'Index Name' in node else set()
+    for child in node.get('Plans', []):
+        child_types, child_indexes = _walk_plan(child)
+        node_types |= child_types
+        index_names |= child_indexes
+    return node_types, index_names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply database migrations for the Note Taking App")
+    parser.add_argument('--database-url', help="PostgreSQL connection string (default: DATABASE_URL, or TEST_DATABASE_URL with --check-plans)")
+    parser.add_argument('--status', action='store_true', help="list applied and pending migrations")
+    parser.add_argument('--check-plans', action='store_true', help="apply migrations, seed data and EXPLAIN every app query")
+    parser.add_argument('--seed-rows', type=int, default=SEED_ROWS, help="rows to seed for --check-plans")
+    args = parser.parse_args()
+
+    # The plan check writes seed data, so it never falls back to the real database
+    env_var = 'TEST_DATABASE_URL' if args.check_plans else 'DATABASE_URL'
+    database_url = args.database_url or os.getenv(env_var)
+    if not database_url:
+        print(f"❌ Error: {env_var} not found in .env file")
+        print("   Use the connection string from Supabase (Settings → Database) or a local PostgreSQL")
+        return 1
+
+    conn = connect(database_url)
+    try:
+        if args.status:
+            print_status(conn)
+            return 0
+
+        try:
+            applied = apply_migrations(conn)
+        except RuntimeError as e:
+            print(f"❌ Error: {e}")
+            return 1
+        if not applied:
+            print("✓ Database is up to date")
+
+        if args.check_plans:
+            print("\n🔍 Checking query plans...")
+            failures = check_query_plans(conn, args.seed_rows)
+            if failures:
+                print(f"\n❌ {len(failures)} quer{'y' if len(failures) == 1 else 'ies'} not served by an index")
+                return 1
+            print("\n✅ Every query is served by an index")
+        return 0
+    finally:
+        conn.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
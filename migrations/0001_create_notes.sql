@@ -0,0 +1,29 @@
+-- Create notes table
+CREATE TABLE IF NOT EXISTS notes (
+    id SERIAL PRIMARY KEY,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    category TEXT,
+    tags TEXT,
+    event_date DATE,
+    event_time TIME,
+    created_at TIMESTAMP DEFAULT NOW(),
+    updated_at TIMESTAMP DEFAULT NOW()
+);
+
+-- Create indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_notes_updated_at ON notes(updated_at DESC);
+CREATE INDEX IF NOT EXISTS idx_notes_event_date ON notes(event_date DESC);
+CREATE INDEX IF NOT EXISTS idx_notes_created_at ON notes(created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_notes_title ON notes(title);
+
+-- Enable Row Level Security (optional, for future use)
+ALTER TABLE notes ENABLE ROW LEVEL SECURITY;
+
+-- Create policy to allow all operations (for development)
+-- You can customize this later for user-specific access
+DROP POLICY IF EXISTS "Allow all operations for notes" ON notes;
+CREATE POLICY "Allow all operations for notes"
+ON notes FOR ALL
+USING (true)
+WITH CHECK (true);
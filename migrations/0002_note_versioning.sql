@@ -0,0 +1,16 @@
+-- Optimistic versioning: updates must name the version they were based on
+ALTER TABLE notes ADD COLUMN IF NOT EXISTS version INTEGER NOT NULL DEFAULT 1;
+
+-- The server owns version and updated_at, whatever the client sends
+CREATE OR REPLACE FUNCTION notes_bump_version() RETURNS trigger AS $$
+BEGIN
+    NEW.version := OLD.version + 1;
+    NEW.updated_at := NOW();
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS notes_bump_version ON notes;
+CREATE TRIGGER notes_bump_version
+BEFORE UPDATE ON notes
+FOR EACH ROW EXECUTE FUNCTION notes_bump_version();
@@ -0,0 +1,82 @@
+-- Delta sync: every write gets a number from one shared sequence
+CREATE SEQUENCE IF NOT EXISTS note_change_seq;
+ALTER TABLE notes ADD COLUMN IF NOT EXISTS change_seq BIGINT;
+-- Backfill without notes_bump_version, which would reset every updated_at
+ALTER TABLE notes DISABLE TRIGGER notes_bump_version;
+UPDATE notes SET change_seq = nextval('note_change_seq') WHERE change_seq IS NULL;
+ALTER TABLE notes ENABLE TRIGGER notes_bump_version;
+ALTER TABLE notes ALTER COLUMN change_seq SET DEFAULT nextval('note_change_seq');
+ALTER TABLE notes ALTER COLUMN change_seq SET NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_notes_change_seq ON notes(change_seq);
+
+-- Deleted notes leave a tombstone so sync clients can drop them
+CREATE TABLE IF NOT EXISTS note_tombstones (
+    note_id INTEGER PRIMARY KEY,
+    change_seq BIGINT NOT NULL,
+    deleted_at TIMESTAMP DEFAULT NOW()
+);
+CREATE INDEX IF NOT EXISTS idx_note_tombstones_change_seq ON note_tombstones(change_seq);
+
+-- Highest sequence purged by compaction (older sync tokens must resync)
+CREATE TABLE IF NOT EXISTS note_sync_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    compacted_through BIGINT NOT NULL DEFAULT 0
+);
+INSERT INTO note_sync_state (id) VALUES (1) ON CONFLICT (id) DO NOTHING;
+
+-- Numbers must become visible in order: a sync that returned up to N must
+-- never later find a commit below N. Writers take a transaction-level lock
+-- before drawing a number, so numbers are handed out in commit order.
+CREATE OR REPLACE FUNCTION notes_track_change() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('note_change_seq'));
+    IF TG_OP = 'DELETE' THEN
+        INSERT INTO note_tombstones (note_id, change_seq)
+        VALUES (OLD.id, nextval('note_change_seq'))
+        ON CONFLICT (note_id) DO UPDATE
+        SET change_seq = EXCLUDED.change_seq, deleted_at = NOW();
+        RETURN OLD;
+    END IF;
+    NEW.change_seq := nextval('note_change_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS notes_track_change ON notes;
+CREATE TRIGGER notes_track_change
+BEFORE INSERT OR UPDATE OR DELETE ON notes
+FOR EACH ROW EXECUTE FUNCTION notes_track_change();
+
+CREATE OR REPLACE FUNCTION compact_note_tombstones(retention_days INTEGER DEFAULT 30)
+RETURNS INTEGER AS $$
+DECLARE
+    horizon BIGINT;
+    purged INTEGER;
+BEGIN
+    SELECT MAX(change_seq) INTO horizon FROM note_tombstones
+    WHERE deleted_at < NOW() - make_interval(days => retention_days);
+    IF horizon IS NULL THEN
+        RETURN 0;
+    END IF;
+    DELETE FROM note_tombstones WHERE change_seq <= horizon;
+    GET DIAGNOSTICS purged = ROW_COUNT;
+    UPDATE note_sync_state
+    SET compacted_through = GREATEST(compacted_through, horizon)
+    WHERE id = 1;
+    RETURN purged;
+END;
+$$ LANGUAGE plpgsql;
+
+ALTER TABLE note_tombstones ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Allow all operations for note_tombstones" ON note_tombstones;
+CREATE POLICY "Allow all operations for note_tombstones"
+ON note_tombstones FOR ALL
+USING (true)
+WITH CHECK (true);
+
+ALTER TABLE note_sync_state ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Allow all operations for note_sync_state" ON note_sync_state;
+CREATE POLICY "Allow all operations for note_sync_state"
+ON note_sync_state FOR ALL
+USING (true)
+WITH CHECK (true);
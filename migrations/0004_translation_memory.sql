@@ -0,0 +1,17 @@
+-- Translation memory: sentence translations reused across re-translations
+CREATE TABLE IF NOT EXISTS translation_memory (
+    source_hash TEXT NOT NULL,
+    target_language TEXT NOT NULL,
+    model TEXT NOT NULL,
+    source_text TEXT NOT NULL,
+    translation TEXT NOT NULL,
+    created_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (source_hash, target_language, model)
+);
+
+ALTER TABLE translation_memory ENABLE ROW LEVEL SECURITY;
+DROP POLICY IF EXISTS "Allow all operations for translation_memory" ON translation_memory;
+CREATE POLICY "Allow all operations for translation_memory"
+ON translation_memory FOR ALL
+USING (true)
+WITH CHECK (true);
@@ -0,0 +1,21 @@
+-- Indexes matching the query shapes in backend/app.py
+-- (verified with: python migrate.py --check-plans)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Sort "Event Date": ORDER BY event_date ASC NULLS LAST, event_time ASC
+CREATE INDEX IF NOT EXISTS idx_notes_event_date_time ON notes(event_date, event_time);
+
+-- Sort "Event Time": ORDER BY event_time ASC NULLS LAST, event_date ASC
+CREATE INDEX IF NOT EXISTS idx_notes_event_time_date ON notes(event_time, event_date);
+
+-- Covered by idx_notes_event_date_time
+DROP INDEX IF EXISTS idx_notes_event_date;
+
+-- Search: title/content/category/tags ILIKE '%query%' (combined with OR)
+CREATE INDEX IF NOT EXISTS idx_notes_title_trgm ON notes USING GIN (title gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_notes_content_trgm ON notes USING GIN (content gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_notes_category_trgm ON notes USING GIN (category gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_notes_tags_trgm ON notes USING GIN (tags gin_trgm_ops);
+
+-- Tombstone compaction: WHERE deleted_at < cutoff
+CREATE INDEX IF NOT EXISTS idx_note_tombstones_deleted_at ON note_tombstones(deleted_at);
@@ -2,7 +2,11 @@
 Main entry point for the Note Taking App.
 This script runs the Flask application from the backend folder.
 Compatible with both local development and Vercel deployment.
+
+    python run.py          # Flask development server
+    python run.py --prod   # pre-forking gunicorn server (or set APP_ENV=production)
 """
+import argparse
 import sys
 import os
 
@@ -11,7 +15,7 @@ backend_path = os.path.join(os.path.dirname(__file__), 'backend')
 sys.path.insert(0, backend_path)
 
 # Import and run the app
-from app import app, init_db
+from app import app, init_db, warmup, warmup_worker
 
 # Initialize database (for local development)
 # On Vercel, make sure table is created in Supabase first
@@ -24,7 +28,27 @@ except Exception as e:
 # Vercel will use this 'app' object
 app = app
 
+def serve_production():
+    """Replace this process with gunicorn, configured by gunicorn.conf.py"""
+    project_dir = os.path.dirname(os.path.abspath(__file__))
+    config_path = os.path.join(project_dir, 'gunicorn.conf.py')
+    
+    print("🚀 Starting production server (gunicorn, see gunicorn.conf.py)")
+    os.execvp(sys.executable, [
+        sys.executable, '-m', 'gunicorn',
+        '--config', config_path,
+        '--chdir', project_dir,
+        'run:app'
+    ])
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Run the Note Taking App")
+    parser.add_argument('--prod', action='store_true', help="serve with pre-forked gunicorn workers instead of the development server")
+    args = parser.parse_args()
+    
+    if args.prod or os.getenv('APP_ENV') == 'production':
+        serve_production()
+    
     # Run the Flask development server (local only)
     print("\n" + "="*50)
     print("🚀 Note Taking App is starting...")
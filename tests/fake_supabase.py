@@ -0,0 +1,64 @@
+"""
+In-memory stand-in for the Supabase client, covering the query builder
+calls made by backend/sync.py
+"""
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeQuery:
+    def __init__(self, client, table):
+        self.client = client
+        self.table_name = table
+        self.filters = []
+        self.order_by = None
+        self.row_limit = None
+
+    def select(self, columns='*'):
+        self.columns = columns
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] > value)
+        return self
+
+    def order(self, column, desc=False):
+        self.order_by = (column, desc)
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def execute(self):
+        rows = [dict(row) for row in self.client.tables.get(self.table_name, []) if all(f(row) for f in self.filters)]
+        if self.order_by:
+            rows.sort(key=lambda row: row[self.order_by[0]], reverse=self.order_by[1])
+        if self.row_limit is not None:
+            rows = rows[:self.row_limit]
+        self.client.queries.append(self.table_name)
+        # Lets a test change the data between two queries of one call
+        if self.client.after_query:
+            self.client.after_query(self.table_name)
+        return FakeResponse(rows)
+
+
+class FakeClient:
+    def __init__(self, notes=None, tombstones=None, compacted_through=0):
+        self.tables = {
+            'notes': list(notes or []),
+            'note_tombstones': list(tombstones or []),
+            'note_sync_state': [{'id': 1, 'compacted_through': compacted_through}]
+        }
+        self.queries = []
+        self.after_query = None
+
+    def table(self, name):
+        return FakeQuery(self, name)
@@ -0,0 +1,186 @@
+"""
+Tests for the LLM call scheduler (backend/llm_scheduler.py)
+"""
+import threading
+import time
+
+import pytest
+
+from backend.llm_scheduler import BACKGROUND, INTERACTIVE, LLMBusyError, LLMScheduler
+
+
+def wait_until(predicate, timeout=2):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+class Caller(threading.Thread):
+    """Runs scheduler.run() on its own thread and keeps the outcome"""
+
+    def __init__(self, scheduler, key, fn, priority=INTERACTIVE):
+        super().__init__(daemon=True)
+        self.args = (key, fn, priority)
+        self.scheduler = scheduler
+        self.result = None
+        self.error = None
+        self.start()
+
+    def run(self):
+        try:
+            self.result = self.scheduler.run(*self.args)
+        except BaseException as e:
+            self.error = e
+
+
+def blocker(scheduler):
+    """Occupy the only upstream slot until the returned event is set"""
+    release = threading.Event()
+    caller = Caller(scheduler, 'blocker', lambda: release.wait(2) and 'blocked')
+    wait_until(lambda: scheduler.stats()['running'] == 1)
+    return release, caller
+
+
+def test_coalesces_running_call():
+    scheduler = LLMScheduler(max_concurrency=2, timeout=5)
+    release = threading.Event()
+    calls = []
+
+    def fn():
+        calls.append(1)
+        release.wait(2)
+        return 'answer'
+
+    first = Caller(scheduler, 'same', fn)
+    wait_until(lambda: scheduler.stats()['running'] == 1)
+    second = Caller(scheduler, 'same', fn)
+    wait_until(lambda: scheduler.stats()['coalesced'] == 1)
+    release.set()
+    first.join(2)
+    second.join(2)
+
+    assert first.result == second.result == 'answer'
+    assert len(calls) == 1
+
+
+def test_coalesces_queued_call():
+    scheduler = LLMScheduler(max_concurrency=1, timeout=5)
+    release, _ = blocker(scheduler)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return 'answer'
+
+    callers = [Caller(scheduler, 'same', fn) for _ in range(3)]
+    wait_until(lambda: scheduler.stats()['coalesced'] == 2)
+    assert scheduler.stats()['queue_depth'] == 1
+    release.set()
+    for caller in callers:
+        caller.join(2)
+
+    assert [caller.result for caller in callers] == ['answer'] * 3
+    assert len(calls) == 1
+
+
+def test_interactive_runs_before_background():
+    scheduler = LLMScheduler(max_concurrency=1, timeout=5)
+    release, _ = blocker(scheduler)
+    order = []
+
+    background = Caller(scheduler, 'bulk', lambda: order.append('background'), BACKGROUND)
+    wait_until(lambda: scheduler.stats()['queue_depth'] == 1)
+    interactive = Caller(scheduler, 'editor', lambda: order.append('interactive'), INTERACTIVE)
+    wait_until(lambda: scheduler.stats()['queue_depth'] == 2)
+    release.set()
+    background.join(2)
+    interactive.join(2)
+
+    assert order == ['interactive', 'background']
+
+
+def test_full_queue_rejects():
+    scheduler = LLMScheduler(max_concurrency=1, max_queue=2, max_background_queue=1, timeout=5)
+    release, _ = blocker(scheduler)
+
+    queued = [Caller(scheduler, 'bulk-1', lambda: 1, BACKGROUND)]
+    wait_until(lambda: scheduler.stats()['queue_depth'] == 1)
+    # Background work hits its lower limit first
+    with pytest.raises(LLMBusyError):
+        scheduler.run('bulk-2', lambda: 2, BACKGROUND)
+
+    queued.append(Caller(scheduler, 'editor-1', lambda: 3))
+    wait_until(lambda: scheduler.stats()['queue_depth'] == 2)
+    with pytest.raises(LLMBusyError):
+        scheduler.run('editor-2', lambda: 4)
+
+    release.set()
+    for caller in queued:
+        caller.join(2)
+    assert [caller.result for caller in queued] == [1, 3]
+    assert scheduler.stats()['rejected'] == 2
+
+
+def test_error_releases_every_waiter():
+    scheduler = LLMScheduler(max_concurrency=1, timeout=5)
+    release, _ = blocker(scheduler)
+
+    def fn():
+        raise ValueError("upstream failed")
+
+    callers = [Caller(scheduler, 'same', fn) for _ in range(2)]
+    wait_until(lambda: scheduler.stats()['coalesced'] == 1)
+    release.set()
+    for caller in callers:
+        caller.join(2)
+
+    assert all(isinstance(caller.error, ValueError) for caller in callers)
+    stats = scheduler.stats()
+    assert stats['failed'] == 1 and stats['running'] == 0 and stats['queue_depth'] == 0
+    # The key is free again
+    assert scheduler.run('same', lambda: 'retry') == 'retry'
+
+
+def test_base_exception_reaches_the_caller():
+    scheduler = LLMScheduler(max_concurrency=1, timeout=5)
+
+    def fn():
+        raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        scheduler.run('boom', fn)
+    assert scheduler.stats()['running'] == 0
+    assert scheduler.run('next', lambda: 'ok') == 'ok'
+
+
+def test_priority_raise_skips_stale_heap_entry():
+    scheduler = LLMScheduler(max_concurrency=1, timeout=5)
+    release, _ = blocker(scheduler)
+    calls = []
+    order = []
+
+    def shared():
+        calls.append(1)
+        order.append('shared')
+        return 'shared'
+
+    other = Caller(scheduler, 'other', lambda: order.append('other'), BACKGROUND)
+    wait_until(lambda: scheduler.stats()['queue_depth'] == 1)
+    queued = Caller(scheduler, 'shared', shared, BACKGROUND)
+    wait_until(lambda: scheduler.stats()['queue_depth'] == 2)
+    # An interactive caller joins the queued background call and speeds it up
+    joined = Caller(scheduler, 'shared', shared, INTERACTIVE)
+    wait_until(lambda: scheduler.stats()['coalesced'] == 1)
+    release.set()
+    for caller in (other, queued, joined):
+        caller.join(2)
+
+    assert order == ['shared', 'other']
+    assert len(calls) == 1
+    assert queued.result == joined.result == 'shared'
+    # The leftover background heap entry was dropped, not run or counted again
+    stats = scheduler.stats()
+    assert stats['queue_depth'] == 0 and stats['completed'] == 3
+    assert not scheduler._heap
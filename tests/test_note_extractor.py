@@ -0,0 +1,142 @@
+"""
+Tests for the rule-based note extractor (backend/note_extractor.py)
+Run from the project root: pytest
+"""
+from datetime import date
+
+from backend.note_extractor import (
+    correct_event_fields,
+    extract_note_locally,
+    find_event_date,
+    find_event_dates,
+    find_event_time,
+)
+
+# A Monday
+TODAY = date(2026, 10, 19)
+
+
+def llm_note(event_date=None, event_time=None):
+    return {'title': 'Note', 'content': '', 'category': '', 'tags': '',
+            'event_date': event_date, 'event_time': event_time}
+
+
+# Date parsing
+
+def test_relative_days():
+    assert find_event_date('Badminton tmr 5pm', TODAY)[0] == '2026-10-20'
+    assert find_event_date('Dinner tonight', TODAY)[0] == '2026-10-19'
+    assert find_event_date('Exam day after tomorrow', TODAY)[0] == '2026-10-21'
+
+
+def test_weekdays():
+    assert find_event_date('Gym on Friday', TODAY)[0] == '2026-10-23'
+    assert find_event_date('Standup Monday', TODAY)[0] == '2026-10-26'
+    assert find_event_date('Standup this Monday', TODAY)[0] == '2026-10-19'
+    assert find_event_date('Lab thu', TODAY)[0] == '2026-10-22'
+
+
+def test_ambiguous_weekday_abbreviations_need_a_qualifier():
+    assert find_event_date('Watch the sun set at the beach', TODAY) == (None, None)
+    assert find_event_date('I sat down with the team', TODAY) == (None, None)
+    assert find_event_date('Meeting on the sun deck 9am', TODAY) == (None, None)
+    assert find_event_date('Brunch next sun', TODAY)[0] == '2026-10-25'
+    assert find_event_date('Movie this sat', TODAY)[0] == '2026-10-24'
+
+
+def test_month_days():
+    assert find_event_date('Flight Dec 3', TODAY)[0] == '2026-12-03'
+    assert find_event_date('Rent due 1st nov', TODAY)[0] == '2026-11-01'
+    assert find_event_date('Trip 2027-01-15', TODAY)[0] == '2027-01-15'
+    assert find_event_date('Flight Feb 30', TODAY) == (None, None)
+
+
+def test_ambiguous_months_need_capital_or_ordinal():
+    assert find_event_date('I may 5 go', TODAY) == (None, None)
+    assert find_event_date('We march 3 times a week', TODAY) == (None, None)
+    assert find_event_date('Exam May 5', TODAY)[0] == '2026-05-05'
+    assert find_event_date('Exam may 5th', TODAY)[0] == '2026-05-05'
+
+
+def test_find_event_dates_in_reading_order():
+    dates = [found for found, _ in find_event_dates('Meeting moved from Monday to Friday 3pm', TODAY)]
+    assert dates == ['2026-10-26', '2026-10-23']
+    # "next Friday" is one mention, not two
+    assert len(find_event_dates('Review next Friday', TODAY)) == 1
+
+
+# Time parsing
+
+def test_times():
+    assert find_event_time('Badminton 5pm')[0] == '17:00'
+    assert find_event_time('Call at 9:30am')[0] == '09:30'
+    assert find_event_time('Lunch 12pm')[0] == '12:00'
+    assert find_event_time('Deploy at 12am')[0] == '00:00'
+    assert find_event_time('Standup 14:15')[0] == '14:15'
+    assert find_event_time('Lunch at noon')[0] == '12:00'
+    assert find_event_time('Buy milk') == (None, None)
+
+
+# Local extraction
+
+def test_extract_short_reminder():
+    note, confident = extract_note_locally('Badminton tmr 5pm @polyu', 'English', TODAY)
+    assert confident
+    assert note['title'] == 'Badminton at Polyu'
+    assert note['category'] == 'Personal'
+    assert note['event_date'] == '2026-10-20'
+    assert note['event_time'] == '17:00'
+    assert note['content'] == 'Badminton tomorrow 5pm at polyu'
+
+
+def test_extract_defers_to_llm():
+    # Not English, no known keyword, or more than one date
+    assert not extract_note_locally('Badminton tmr 5pm', 'Chinese', TODAY)[1]
+    assert not extract_note_locally('Something vague', 'English', TODAY)[1]
+    assert not extract_note_locally('Meeting Monday or Friday', 'English', TODAY)[1]
+
+
+def test_extract_defers_ambiguous_clock_time():
+    # 7:30 may be morning or evening, 19:30 and 7:30pm are not ambiguous
+    assert not extract_note_locally('Meeting 7:30', 'English', TODAY)[1]
+    assert not extract_note_locally('Meeting tmr 12:15', 'English', TODAY)[1]
+    assert extract_note_locally('Meeting 19:30', 'English', TODAY)[1]
+    assert extract_note_locally('Meeting 7:30pm', 'English', TODAY)[1]
+
+
+# Correcting LLM output
+
+def test_single_mention_overrides_llm():
+    note = correct_event_fields(llm_note('2026-10-21', '05:00'), 'Badminton tmr 5pm', TODAY)
+    assert note['event_date'] == '2026-10-20'
+    assert note['event_time'] == '17:00'
+
+
+def test_several_mentions_keep_llm_value():
+    note = correct_event_fields(llm_note('2026-10-23', None), 'Meeting moved from Monday to Friday 3pm', TODAY)
+    assert note['event_date'] == '2026-10-23'
+    assert note['event_time'] == '15:00'
+
+
+def test_several_mentions_clear_malformed_llm_value():
+    note = correct_event_fields(llm_note('next friday', '3 pm'), 'Call at 9am, not 10am, Monday or Tuesday', TODAY)
+    assert note['event_date'] is None
+    assert note['event_time'] is None
+
+
+def test_no_mention_keeps_llm_null():
+    note = correct_event_fields(llm_note(), 'Watch the sun set at the beach', TODAY)
+    assert note['event_date'] is None
+    assert note['event_time'] is None
+
+
+def test_no_mention_keeps_valid_llm_value():
+    note = correct_event_fields(llm_note('2026-10-19', None), 'Meeting on the sun deck 9am', TODAY)
+    assert note['event_date'] == '2026-10-19'
+    assert note['event_time'] == '09:00'
+
+
+def test_no_mention_clears_malformed_llm_value():
+    note = correct_event_fields(llm_note('19/10/2026', '25:00'), 'Write the report', TODAY)
+    assert note['event_date'] is None
+    assert note['event_time'] is None
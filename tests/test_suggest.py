@@ -0,0 +1,132 @@
+"""
+Tests for the search suggestion index (backend/suggest.py)
+"""
+import pytest
+
+import backend.suggest as suggest
+from backend.suggest import SuggestIndex
+from fake_supabase import FakeClient
+
+
+def note(note_id, title='', tags='', category='', updated_at='2026-10-01', seq=None):
+    return {'id': note_id, 'title': title, 'tags': tags, 'category': category,
+            'updated_at': updated_at, 'change_seq': seq if seq is not None else note_id}
+
+
+def texts(results):
+    return [result['text'] for result in results]
+
+
+suggest_fetch = suggest.fetch_changes
+
+
+@pytest.fixture
+def small_pages(monkeypatch):
+    # Two changes per sync page, so refresh has to follow has_more
+    monkeypatch.setattr(suggest, 'fetch_changes',
+                        lambda client, since, columns: suggest_fetch(client, since, limit=2, columns=columns))
+
+
+def test_matches_tags_categories_and_title_words():
+    index = SuggestIndex()
+    index.upsert_note(note(1, title='Badminton at PolyU', tags='sports, polyu', category='Personal'))
+
+    assert texts(index.suggest('bad')) == ['Badminton at PolyU']
+    # Titles match from the start of every word, tags only from their start
+    assert sorted(texts(index.suggest('pol'))) == ['Badminton at PolyU', 'polyu']
+    assert texts(index.suggest('minton')) == []
+    assert texts(index.suggest('PERS')) == ['Personal']
+    assert index.suggest('') == []
+    assert index.suggest('bad', limit=0) == []
+
+
+def test_ranks_by_count_then_recency_then_name():
+    index = SuggestIndex()
+    index.upsert_note(note(1, tags='alpha', updated_at='2026-10-01'))
+    index.upsert_note(note(2, tags='apple', updated_at='2026-10-05'))
+    index.upsert_note(note(3, tags='avocado, alpha', updated_at='2026-10-02'))
+    index.upsert_note(note(4, tags='apricot', updated_at='2026-10-05'))
+
+    results = index.suggest('a')
+    assert texts(results) == ['alpha', 'apple', 'apricot', 'avocado']
+    assert results[0]['count'] == 2
+    assert texts(index.suggest('a', limit=2)) == ['alpha', 'apple']
+
+
+def test_frequent_term_beyond_many_rare_ones():
+    index = SuggestIndex()
+    for i in range(600):
+        index.upsert_note(note(i, title=f'aa{i:04d}'))
+    for i in range(600, 650):
+        index.upsert_note(note(i, tags='azure'))
+
+    assert texts(index.suggest('a', limit=1)) == ['azure']
+
+
+def test_upsert_replaces_and_remove_drops_terms():
+    index = SuggestIndex()
+    index.upsert_note(note(1, title='Dentist', tags='health'))
+    index.upsert_note(note(2, tags='health'))
+
+    index.upsert_note(note(1, title='Doctor', tags='health'))
+    assert texts(index.suggest('d')) == ['Doctor']
+    assert index.suggest('health')[0]['count'] == 2
+
+    index.remove_note(1)
+    assert index.suggest('d') == []
+    assert index.suggest('health')[0]['count'] == 1
+    index.remove_note(2)
+    assert index.suggest('health') == []
+
+
+def test_refresh_follows_pages_and_applies_deletes(small_pages):
+    client = FakeClient(notes=[note(i, tags=f'tag{i}') for i in range(1, 6)])
+    index = SuggestIndex()
+
+    index.refresh(client)
+    assert index.token == '5'
+    assert len(index.suggest('tag')) == 5
+
+    client.tables['notes'].append(note(6, tags='tag6', seq=7))
+    client.tables['notes'] = [n for n in client.tables['notes'] if n['id'] != 2]
+    client.tables['note_tombstones'].append({'note_id': 2, 'change_seq': 6})
+
+    index.refresh(client)
+    assert index.token == '7'
+    assert sorted(texts(index.suggest('tag'))) == ['tag1', 'tag3', 'tag4', 'tag5', 'tag6']
+
+
+def test_refresh_reset_rebuilds_index(small_pages):
+    client = FakeClient(notes=[note(1, tags='old'), note(2, tags='kept')])
+    index = SuggestIndex()
+    index.refresh(client)
+
+    # Note 1 was deleted and its tombstone compacted away
+    client.tables['notes'] = [note(2, tags='kept')]
+    client.tables['note_sync_state'][0]['compacted_through'] = 5
+
+    index.refresh(client)
+    assert texts(index.suggest('old')) == []
+    assert texts(index.suggest('kept')) == ['kept']
+
+
+def test_refresh_if_stale_waits_and_backs_off(monkeypatch):
+    index = SuggestIndex()
+    client = FakeClient(notes=[note(1, tags='one')])
+
+    index.refresh_if_stale(client)
+    queries = len(client.queries)
+    index.refresh_if_stale(client)
+    assert len(client.queries) == queries
+
+    failing = SuggestIndex()
+
+    def fail(client, since, columns):
+        raise RuntimeError("database down")
+
+    monkeypatch.setattr(suggest, 'fetch_changes', fail)
+    with pytest.raises(RuntimeError):
+        failing.refresh_if_stale(client)
+    # The next attempt waits for SUGGEST_RETRY_INTERVAL
+    assert not failing.is_stale()
+    failing.refresh_if_stale(client)
@@ -0,0 +1,67 @@
+"""
+Tests for the delta sync feed (backend/sync.py)
+"""
+import pytest
+
+from backend.sync import fetch_changes, parse_sync_token
+from fake_supabase import FakeClient
+
+
+def note(note_id, seq):
+    return {'id': note_id, 'title': f'Note {note_id}', 'change_seq': seq}
+
+
+def test_parse_sync_token():
+    assert parse_sync_token('') == 0
+    assert parse_sync_token(None) == 0
+    assert parse_sync_token('42') == 42
+    with pytest.raises(ValueError):
+        parse_sync_token('-1')
+    with pytest.raises(ValueError):
+        parse_sync_token('abc')
+
+
+def test_full_sync_pages_through_notes():
+    client = FakeClient(notes=[note(i, i) for i in range(1, 6)])
+
+    first = fetch_changes(client, 0, limit=3)
+    assert [n['id'] for n in first['notes']] == [1, 2, 3]
+    assert first['token'] == '3' and first['has_more'] and not first['reset']
+
+    second = fetch_changes(client, int(first['token']), limit=3)
+    assert [n['id'] for n in second['notes']] == [4, 5]
+    assert second['token'] == '5' and not second['has_more']
+
+
+def test_delta_merges_notes_and_tombstones_in_order():
+    client = FakeClient(notes=[note(1, 2), note(3, 5)], tombstones=[{'note_id': 2, 'change_seq': 4}])
+
+    changes = fetch_changes(client, 1)
+    assert [n['id'] for n in changes['notes']] == [1, 3]
+    assert changes['deleted'] == [2]
+    assert changes['token'] == '5'
+
+
+def test_token_older_than_compaction_resets():
+    client = FakeClient(notes=[note(1, 10)], compacted_through=8)
+
+    changes = fetch_changes(client, 5)
+    assert changes['reset']
+    assert [n['id'] for n in changes['notes']] == [1]
+    assert changes['deleted'] == []
+
+
+def test_compaction_between_reads_resets():
+    client = FakeClient(notes=[note(1, 10)], tombstones=[{'note_id': 2, 'change_seq': 6}, {'note_id': 3, 'change_seq': 7}])
+
+    def compact(table):
+        # Compaction purges tombstones 6 and 7 right after the notes read
+        if table == 'notes':
+            client.tables['note_tombstones'] = []
+            client.tables['note_sync_state'][0]['compacted_through'] = 7
+
+    client.after_query = compact
+
+    changes = fetch_changes(client, 5)
+    assert changes['reset']
+    assert [n['id'] for n in changes['notes']] == [1]